@@ -0,0 +1,76 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import glob
+
+_NUMA_NODES_DIR = "/sys/devices/system/node"
+
+
+def parse_cpu_list(cpu_list: str):
+    """Parse Linux CPU list format, e.g. "0-3,8,10-11"."""
+    cpus = set()
+    for part in cpu_list.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def numa_nodes():
+    """Return a dict of NUMA node numbers to lists of their CPU cores."""
+    nodes = {}
+    for node_dir in glob.glob(os.path.join(_NUMA_NODES_DIR, "node[0-9]*")):
+        node = int(os.path.basename(node_dir)[len("node"):])
+        with open(os.path.join(node_dir, "cpulist")) as fp:
+            nodes[node] = parse_cpu_list(fp.read())
+    if not nodes:
+        # No NUMA information, treat the machine as a single node
+        nodes[0] = sorted(os.sched_getaffinity(0))
+    return dict(sorted(nodes.items()))
+
+
+def numa_node_cpus(node_list: str):
+    nodes = numa_nodes()
+    cpus = set()
+    for node in parse_cpu_list(node_list):
+        if node not in nodes:
+            raise ValueError(f"NUMA node {node} doesn't exist, available nodes: {list(nodes)}")
+        cpus.update(nodes[node])
+    return sorted(cpus)
+
+
+def set_affinity(cpus):
+    """
+    Pin the current process to cpus. Processes started after that, such as
+    Ray raylet and workers or generator workers, inherit the affinity.
+    Affinity is only supported on Linux, the launcher checks it.
+    """
+    os.sched_setaffinity(0, cpus)
+
+
+def topology():
+    """Describe CPU cores the current process may run on and their NUMA nodes."""
+    cpus = sorted(os.sched_getaffinity(0))
+    nodes = {
+        str(node): [cpu for cpu in node_cpus if cpu in cpus]
+        for node, node_cpus in numa_nodes().items()
+    }
+    return {
+        "cpus": cpus,
+        "numa_nodes": {node: node_cpus for node, node_cpus in nodes.items() if node_cpus},
+    }
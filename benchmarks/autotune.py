@@ -0,0 +1,128 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import json
+import time
+from collections import OrderedDict
+
+# Read block sizes in MB tried for the chunked reader
+BLOCK_SIZES = (16, 32, 64, 128, 256)
+# Numbers of partitions per CPU tried, Modin uses one by default
+PARTITIONS_PER_CPU = (1, 2, 4)
+
+
+def initial_config(host_cpus: int, chunked: bool):
+    """Defaults of Modin and the chunked reader, the search starts from them."""
+    config = OrderedDict(cpus=host_cpus, npartitions=host_cpus)
+    if chunked:
+        config["read_block_size"] = 64
+    return config
+
+
+def search_space(host_cpus: int, chunked: bool):
+    """
+    Return the list of (parameter, candidates) pairs, candidates is a
+    function of the current configuration, because numbers of partitions
+    are tried relative to the number of CPUs.
+    """
+    cpus = sorted({max(host_cpus // d, 1) for d in (1, 2, 4)}, reverse=True)
+    space = [
+        ("cpus", lambda config: cpus),
+        (
+            "npartitions",
+            lambda config: [config["cpus"] * k for k in PARTITIONS_PER_CPU],
+        ),
+    ]
+    if chunked:
+        space.append(("read_block_size", lambda config: list(BLOCK_SIZES)))
+    return space
+
+
+def tune(run_trial, space: list, initial: dict, trials: int):
+    """
+    Search the configuration with the shortest time by coordinate descent:
+    candidates of every parameter are tried in turn with the rest fixed at
+    the best values found so far, until no parameter improves the time or
+    trials are spent. run_trial takes a configuration and returns its time.
+    Returns the best configuration, its time and the list of (configuration,
+    time) of all trials, the first of them is the initial configuration.
+    """
+    history = []
+
+    def trial(config):
+        seconds = run_trial(config)
+        history.append((dict(config), seconds))
+        print(f"Trial {len(history)}/{trials}: {config} took {seconds} seconds")
+        return seconds
+
+    best = dict(initial)
+    best_time = trial(best)
+    tried = [best]
+    improved = True
+    while improved and len(history) < trials:
+        improved = False
+        for name, candidates in space:
+            for value in candidates(best):
+                config = dict(best, **{name: value})
+                if config in tried:
+                    continue
+                if len(history) >= trials:
+                    return best, best_time, history
+                tried.append(config)
+                seconds = trial(config)
+                if seconds < best_time:
+                    best, best_time = config, seconds
+                    improved = True
+    return best, best_time, history
+
+
+def profile_key(benchmark: str, size: dict, engine: str, reader: str):
+    # Best configurations depend on the host, so they are kept per number of CPUs
+    return OrderedDict(
+        benchmark=benchmark,
+        size=size,
+        engine=engine,
+        reader=reader,
+        host_cpus=os.cpu_count(),
+    )
+
+
+def _key_string(key: dict):
+    return json.dumps(key, sort_keys=True)
+
+
+def load_profile(filename: str):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as fp:
+        return json.load(fp, object_pairs_hook=OrderedDict)
+
+
+def find_config(profile: dict, key: dict):
+    """Return the best configuration stored for key, None if it wasn't tuned."""
+    entry = profile.get(_key_string(key))
+    return entry["config"] if entry is not None else None
+
+
+def save_config(filename: str, key: dict, config: dict, seconds: float, trials: int):
+    profile = load_profile(filename)
+    profile[_key_string(key)] = OrderedDict(
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **key,
+        config=config,
+        total=seconds,
+        trials=trials,
+    )
+    with open(filename, "w") as fp:
+        json.dump(profile, fp, indent=4)
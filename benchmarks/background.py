@@ -0,0 +1,73 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import sys
+import subprocess
+
+
+def available_memory():
+    """Memory available for new processes in bytes, None without psutil."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available
+
+
+class BackgroundGenerator:
+    """
+    Generator of benchmark datasets in launcher processes running with
+    --generate-only on reserved CPU cores, while the current process runs
+    benchmarks on the rest of the cores. Datasets are generated with the
+    same options as in the current process, so they are the same files.
+    """
+
+    def __init__(self, launcher: str, argv: list, cpus: list, min_memory: int):
+        self._launcher = launcher
+        self._argv = argv
+        self._cpus = cpus
+        self._min_memory = min_memory
+        self._processes = {}
+
+    def start(self, name: str):
+        """
+        Start generating the dataset of a benchmark if there is enough free
+        memory, otherwise it is left to the benchmark. Returns whether
+        generation is started.
+        """
+        available = available_memory()
+        if available is not None and available < self._min_memory:
+            print(
+                f"Only {available / 2**30:.1f} GB of memory is available, {name} dataset is not generated in background"
+            )
+            return False
+        print(f"Generating {name} dataset in background on CPU cores {self._cpus}")
+        cmd = [sys.executable, self._launcher] + self._argv
+        cmd += ["-m", name, "--generate-only", "--cpu-list", ",".join(map(str, self._cpus))]
+        self._processes[name] = subprocess.Popen(cmd)
+        return True
+
+    def wait(self, name: str):
+        """
+        Wait until the dataset of a benchmark is generated in background.
+        Returns False if it wasn't started or failed, then the benchmark
+        generates it itself.
+        """
+        process = self._processes.pop(name, None)
+        if process is None:
+            return False
+        returncode = process.wait()
+        if returncode != 0:
+            print(f"Background generation of {name} dataset failed with exit code {returncode}")
+            return False
+        return True
@@ -12,9 +12,9 @@
 # governing permissions and limitations under the License.
 
 import sys
-import time
 import json
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import modin.pandas as pd
 
 from sklearn import config_context
@@ -25,8 +25,30 @@ from sklearn.model_selection import train_test_split
 import sklearn.linear_model as lm
 import numpy as np
 
-
-def read(filename):
+from benchmarks.checkpoint import open_checkpoints, add_saving_time
+from benchmarks.timing import measure
+from benchmarks.tracing import span, read_span
+from benchmarks.load import run_load as run_clients_load
+from benchmarks.csv_reader import (
+    read_csv_chunked,
+    read_throughput,
+    compression_ratio,
+    split_file,
+    read_range,
+    default_executor,
+)
+from benchmarks.schema import load_schema, compact_dtypes, frame_memory
+from benchmarks.ridge import RidgeStatistics
+
+PHASES = ("Reading", "ETL", "ML")
+
+# ML specific
+N_RUNS = 50
+TEST_SIZE = 0.1
+RANDOM_STATE = 777
+
+
+def get_dtypes(filename, compact=False):
     columns_names = [
         "YEAR0",
         "DATANUM",
@@ -122,15 +144,27 @@ def read(filename):
         "float64",
     ]
     dtypes = {columns_names[i]: columns_types[i] for i in range(len(columns_names))}
-
-    df = pd.read_csv(
-        filename,
-        names=columns_names,
-        dtype=dtypes,
-        skiprows=1,
-    )
-
-    df.shape  # to trigger real execution on omnisci
+    if compact:
+        dtypes = compact_dtypes(dtypes, load_schema(filename))
+    return dtypes
+
+
+def read(filename, reader="modin", block_size=None, compact=False):
+    dtypes = get_dtypes(filename, compact)
+    columns_names = list(dtypes.keys())
+
+    with read_span(filename) as attrs:
+        if reader == "chunked":
+            df = read_csv_chunked(filename, dtypes, block_size)
+        else:
+            df = pd.read_csv(
+                filename,
+                names=columns_names,
+                dtype=dtypes,
+                skiprows=1,
+            )
+
+        attrs["rows"] = len(df)  # to trigger real execution on omnisci
     return df
 
 
@@ -207,18 +241,22 @@ def ml(X, y, random_state, n_runs, test_size):
 
     print("ML runs: ", n_runs)
     for i in range(n_runs):
-        (X_train, X_test, y_train, y_test) = train_test_split(
-            X, y, test_size=test_size, random_state=random_state
-        )
+        with span("Split", run=i):
+            (X_train, X_test, y_train, y_test) = train_test_split(
+                X, y, test_size=test_size, random_state=random_state
+            )
         random_state += 777
 
-        with config_context(assume_finite=True):
-            model = clf.fit(X_train, y_train)
+        with span("Fit", run=i, rows=len(y_train), bytes=X_train.nbytes):
+            with config_context(assume_finite=True):
+                model = clf.fit(X_train, y_train)
 
-        y_pred = model.predict(X_test)
+        with span("Predict", run=i, rows=len(y_test), bytes=X_test.nbytes):
+            y_pred = model.predict(X_test)
 
-        mse_values.append(mse(y_test, y_pred))
-        cod_values.append(cod(y_test, y_pred))
+        with span("Score", run=i, rows=len(y_test)):
+            mse_values.append(mse(y_test, y_pred))
+            cod_values.append(cod(y_test, y_pred))
 
     ml_scores["mse_mean"] = sum(mse_values) / len(mse_values)
     ml_scores["cod_mean"] = sum(cod_values) / len(cod_values)
@@ -236,6 +274,97 @@ def ml(X, y, random_state, n_runs, test_size):
     return ml_scores
 
 
+def run_etl(df, res, checkpoints=None):
+    (_, X, y), res["ETL"] = measure(etl, df)
+    if checkpoints is not None:
+        checkpoints.save("ETL", X=X, y=y)
+    return X, y
+
+
+def chunk_statistics(chunk, block, filename, column_names, dtypes, random_state, n_runs, test_size):
+    """
+    Read a block of the data file, run ETL over it and return Ridge
+    statistics of all its rows and of test rows of every run. Test rows are
+    drawn from a stream seeded by the run seed and the block number.
+    """
+    df = read_range(filename, block[0], block[1], column_names, dtypes, False, *block[2:])
+    _, X, y = etl(df)
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+
+    rnd = np.random.default_rng([random_state, chunk])
+    tests = []
+    for _ in range(n_runs):
+        test = rnd.random(len(y)) < test_size
+        tests.append(RidgeStatistics.from_arrays(X[test], y[test]))
+    return RidgeStatistics.from_arrays(X, y), tests
+
+
+def ml_streaming(filename, dtypes, block_size, random_state, n_runs, test_size):
+    """
+    Train Ridge over blocks of the data file without loading it: blocks
+    are read and transformed by ETL in parallel, and only sufficient
+    statistics of their rows are merged, so memory is bounded by the block
+    size. Every run solves the model for the rows that are not its test rows
+    and scores it with statistics of the test rows. Returns scores like ml()
+    and coefficients and intercept of the model over all rows.
+    """
+    column_names, blocks = split_file(filename, block_size)
+    args = (filename, column_names, dtypes, random_state, n_runs, test_size)
+    with span("Statistics", rows=0) as attrs:
+        if default_executor() == "ray":
+            import ray
+
+            remote_statistics = ray.remote(chunk_statistics)
+            results = ray.get(
+                [remote_statistics.remote(i, block, *args) for i, block in enumerate(blocks)]
+            )
+        else:
+            with ThreadPoolExecutor() as executor:
+                results = list(
+                    executor.map(lambda b: chunk_statistics(b[0], b[1], *args), enumerate(blocks))
+                )
+
+        total = RidgeStatistics.empty(len(results[0][0].sxy))
+        tests = [RidgeStatistics.empty(len(total.sxy)) for _ in range(n_runs)]
+        for block_total, block_tests in results:
+            total = total.merge(block_total)
+            tests = [test.merge(block_test) for test, block_test in zip(tests, block_tests)]
+        attrs["rows"] = total.n
+
+    mse_values, cod_values = [], []
+    for i, test in enumerate(tests):
+        with span("Solve", run=i):
+            coef, intercept = total.subtract(test).solve()
+        residuals = test.squared_error(coef, intercept)
+        mse_values.append(residuals / test.n)
+        cod_values.append(1 - residuals / test.syy)
+
+    ml_scores = {}
+    ml_scores["mse_mean"] = sum(mse_values) / len(mse_values)
+    ml_scores["cod_mean"] = sum(cod_values) / len(cod_values)
+    ml_scores["mse_dev"] = float(np.std(mse_values, ddof=1))
+    ml_scores["cod_dev"] = float(np.std(cod_values, ddof=1))
+    return ml_scores, total.solve()
+
+
+def validate_streaming_ridge(X, y, coef, intercept):
+    # Streaming statistics have to give the model Ridge fits in memory
+    model = lm.Ridge().fit(
+        np.ascontiguousarray(X, dtype=np.float64), np.ascontiguousarray(y, dtype=np.float64)
+    )
+    assert np.allclose(model.coef_, coef, rtol=1e-4, atol=1e-8) and np.isclose(
+        model.intercept_, intercept, rtol=1e-4
+    ), "Streaming Ridge coefficients differ from Ridge fitted in memory"
+
+
+def run_ml(X, y, res):
+    _, res["ML"] = measure(
+        ml, X, y, random_state=RANDOM_STATE, n_runs=N_RUNS, test_size=TEST_SIZE
+    )
+    return res
+
+
 def hdk_warmap_query():
     # Trigger HDK initialization by executing a quick trivial
     # query. It is necessary for correct time measurement of ETL part.
@@ -244,27 +373,96 @@ def hdk_warmap_query():
     df.shape
 
 
-def measure(func, *args, **kw):
-    t0 = time.time()
-    res = func(*args, **kw)
-    t1 = time.time()
-    return res, t1 - t0
+def run(
+    input_file,
+    checkpoint_dir=None,
+    from_phase="Reading",
+    reader="modin",
+    block_size=None,
+    compact=False,
+    report_memory=False,
+    streaming=False,
+    validate_streaming=False,
+):
+    """
+    Run Census benchmark over input_file, which is either a data file name
+    or a frame generated in memory. In the latter case there is no Reading
+    phase and checkpoints are not used.
+
+    With streaming, blocks of the data file are read, transformed and
+    reduced to Ridge statistics in one Streaming ML phase instead of
+    Reading, ETL and ML phases.
+    """
+    in_memory = isinstance(input_file, pd.DataFrame)
+    if streaming:
+        if in_memory:
+            raise ValueError("Streaming ML reads blocks of a data file and can't run over a frame")
+        res = OrderedDict()
+        _, res["Engine init"] = measure(hdk_warmap_query)
+        (_, (coef, intercept)), res["Streaming ML"] = measure(
+            ml_streaming,
+            input_file,
+            get_dtypes(input_file, compact),
+            block_size,
+            RANDOM_STATE,
+            N_RUNS,
+            TEST_SIZE,
+        )
+        if validate_streaming:
+            _, X, y = etl(read(input_file, reader, block_size, compact))
+            validate_streaming_ridge(X, y, coef, intercept)
+        return res
+
+    if in_memory:
+        start, checkpoints = 0, None
+    else:
+        start, checkpoints = open_checkpoints(
+            "census", PHASES, from_phase, checkpoint_dir, input_file
+        )
+
+    res = OrderedDict()
+    # In a fresh process the trivial query initializes the engine
+    _, res["Engine init"] = measure(hdk_warmap_query)
+    if in_memory:
+        df = input_file
+    elif start == 0:
+        df, res["Reading"] = measure(read, input_file, reader, block_size, compact)
+        if reader == "chunked":
+            res["Reading throughput, MB/s"] = read_throughput(
+                [input_file], res["Reading"]
+            )
+            ratio = compression_ratio([input_file])
+            if ratio is not None:
+                res["Compression ratio"] = ratio
+        if checkpoints is not None:
+            checkpoints.save("Reading", df=df)
+    elif start == 1:
+        (df,) = checkpoints.load("Reading", "df")
+    if report_memory and start <= 1:
+        res["Frame memory, MB"] = frame_memory(df)
+
+    if start <= 1:
+        X, y = run_etl(df, res, checkpoints)
+    else:
+        X, y = checkpoints.load("ETL", "X", "y")
+    run_ml(X, y, res)
+    add_saving_time(res, checkpoints)
+    return res
 
 
-def run(input_file):
+def run_load(
+    input_file,
+    clients_list,
+    duration,
+    reader="modin",
+    block_size=None,
+    compact=False,
+):
     hdk_warmap_query()
 
     res = OrderedDict()
-    df, res["Reading"] = measure(read, input_file)
-    (_, X, y), res["ETL"] = measure(etl, df)
-
-    # ML specific
-    N_RUNS = 50
-    TEST_SIZE = 0.1
-    RANDOM_STATE = 777
-    _, res["ML"] = measure(
-        ml, X, y, random_state=RANDOM_STATE, n_runs=N_RUNS, test_size=TEST_SIZE
-    )
+    df, res["Reading"] = measure(read, input_file, reader, block_size, compact)
+    res.update(run_clients_load([("ETL", lambda: etl(df))], clients_list, duration))
     return res
 
 
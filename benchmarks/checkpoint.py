@@ -0,0 +1,107 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import json
+import time
+import hashlib
+import modin.pandas as pd
+
+
+def dataset_fingerprint(*filenames):
+    # Hashing contents of multi-gigabyte datasets would take longer than
+    # reading them, so a dataset is identified by its files' paths, sizes
+    # and modification times.
+    h = hashlib.sha1()
+    for filename in filenames:
+        st = os.stat(filename)
+        h.update(f"{os.path.abspath(filename)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+class CheckpointStore:
+    """
+    Phase outputs of a benchmark stored as Parquet files. A manifest is
+    written after all outputs of a phase, so a phase checkpoint is only
+    visible once it is complete.
+    """
+
+    def __init__(self, directory: str, benchmark: str, key: str):
+        self._directory = directory
+        self._prefix = f"{benchmark}_{key}"
+        self.save_time = 0.0
+
+    def _path(self, phase: str, name: str):
+        return os.path.join(self._directory, f"{self._prefix}_{phase.lower()}_{name}")
+
+    def _manifest_path(self, phase: str):
+        return self._path(phase, "manifest.json")
+
+    def has(self, phase: str):
+        return os.path.exists(self._manifest_path(phase))
+
+    def save(self, phase: str, **outputs):
+        t0 = time.time()
+        os.makedirs(self._directory, exist_ok=True)
+        kinds = {}
+        for name, output in outputs.items():
+            if isinstance(output, pd.Series):
+                kinds[name] = "series"
+                output = output.to_frame()
+            else:
+                kinds[name] = "frame"
+            output.to_parquet(self._path(phase, name + ".parquet"))
+        with open(self._manifest_path(phase), "w") as fp:
+            json.dump(kinds, fp)
+        self.save_time += time.time() - t0
+
+    def load(self, phase: str, *names):
+        if not self.has(phase):
+            raise FileNotFoundError(
+                f'No checkpoint for phase "{phase}" in {self._directory}, run from an earlier phase first'
+            )
+        with open(self._manifest_path(phase)) as fp:
+            kinds = json.load(fp)
+        outputs = []
+        for name in names:
+            output = pd.read_parquet(self._path(phase, name + ".parquet"))
+            if kinds[name] == "series":
+                output = output[output.columns[0]]
+            outputs.append(output)
+        return outputs
+
+
+def open_checkpoints(benchmark, phases, from_phase, checkpoint_dir, *input_files):
+    """
+    Check that the benchmark can start from from_phase and return its index
+    in phases together with a checkpoint store, or None if checkpoints are
+    disabled.
+    """
+    if from_phase not in phases:
+        raise ValueError(
+            f'{benchmark} benchmark has no phase "{from_phase}", available phases: {", ".join(phases)}'
+        )
+    start = phases.index(from_phase)
+    if checkpoint_dir is None:
+        if start != 0:
+            raise ValueError("Resuming from a later phase requires a checkpoint directory")
+        return start, None
+    return start, CheckpointStore(
+        checkpoint_dir, benchmark, dataset_fingerprint(*input_files)
+    )
+
+
+def add_saving_time(res, checkpoints):
+    """Report time spent writing checkpoints apart from benchmark phases."""
+    if checkpoints is not None and checkpoints.save_time > 0:
+        res["Checkpoint saving"] = checkpoints.save_time
@@ -0,0 +1,354 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+import modin.pandas as pd
+import modin.config as cfg
+
+from generator.compression import frames_file_name
+
+DEFAULT_BLOCK_SIZE = 64 * 1024 * 1024
+
+_arrow_types = {
+    "int8": pa.int8(),
+    "int16": pa.int16(),
+    "int32": pa.int32(),
+    "int64": pa.int64(),
+    "float32": pa.float32(),
+    "float64": pa.float64(),
+    "string": pa.string(),
+    "timestamp": pa.timestamp("ns"),
+}
+
+_pandas_types = {
+    pa.string(): pandas.StringDtype(),
+}
+
+# Layout of timestamps written by the generator: YYYY-MM-DD HH:MM:SS
+_TIMESTAMP_WIDTH = 19
+_TIMESTAMP_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_TIMESTAMP_SEPARATORS = {4: "-", 7: "-", 10: " ", 13: ":", 16: ":"}
+
+
+def split_byte_ranges(filename, block_size):
+    """
+    Split a CSV file with a header line into byte ranges of about
+    block_size bytes, each of them starting and ending at a line boundary.
+    Returns column names from the header and the list of (start, end) ranges.
+    """
+    size = os.path.getsize(filename)
+    ranges = []
+    with open(filename, "rb") as fp:
+        header = fp.readline()
+        start = len(header)
+        while start < size:
+            end = start + block_size
+            if end >= size:
+                end = size
+            else:
+                fp.seek(end)
+                fp.readline()  # move the boundary to the end of the current line
+                end = fp.tell()
+            ranges.append((start, end))
+            start = end
+    column_names = header.decode().rstrip("\r\n").split(",")
+    return column_names, ranges
+
+
+def load_frames(filename):
+    """Return the frames index of a compressed file, None for plain CSV."""
+    if not os.path.exists(frames_file_name(filename)):
+        return None
+    with open(frames_file_name(filename)) as fp:
+        return json.load(fp)
+
+
+def split_frames(filename, frames):
+    """
+    Return column names and ranges of independently decodable frames of a
+    compressed CSV file. A range is (start, end, codec, uncompressed size,
+    number of leading bytes to skip), the first frame starts with the header.
+    """
+    with open(filename, "rb") as fp:
+        start, size, raw_size = frames["frames"][0]
+        fp.seek(start)
+        header = pa.decompress(
+            fp.read(size), decompressed_size=raw_size, codec=frames["codec"], asbytes=True
+        )[: frames["header_size"]]
+    column_names = header.decode().rstrip("\r\n").split(",")
+    ranges = [
+        (start, start + size, frames["codec"], raw_size, frames["header_size"] if i == 0 else 0)
+        for i, (start, size, raw_size) in enumerate(frames["frames"])
+    ]
+    return column_names, ranges
+
+
+def arrow_column_types(dtype):
+    # Columns with types unknown to Arrow converters are left to Arrow type inference
+    column_types = {}
+    for name, t in dtype.items():
+        if isinstance(t, pandas.CategoricalDtype):
+            column_types[name] = pa.dictionary(pa.int32(), pa.string())
+        elif t in _arrow_types:
+            column_types[name] = _arrow_types[t]
+    return column_types
+
+
+def fixed_timestamps_to_datetime64(raw):
+    """
+    Convert an (n, 19) uint8 array of "YYYY-MM-DD HH:MM:SS" strings to
+    datetime64[ns] with integer arithmetic on the digits.
+    """
+    d = raw[:, _TIMESTAMP_DIGITS].astype(np.int64) - ord("0")
+    year = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+    month = d[:, 4] * 10 + d[:, 5]
+    day = d[:, 6] * 10 + d[:, 7]
+    seconds = (
+        (d[:, 8] * 10 + d[:, 9]) * 3600
+        + (d[:, 10] * 10 + d[:, 11]) * 60
+        + d[:, 12] * 10
+        + d[:, 13]
+    )
+
+    # Days since epoch of a proleptic Gregorian date, years start in March
+    # so that the leap day is the last day of a year.
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    days = era * 146097 + doe - 719468
+
+    return ((days * 86400 + seconds) * 1_000_000_000).view("datetime64[ns]")
+
+
+def _parse_fixed_timestamp_array(arr):
+    n = len(arr)
+    if n > 0 and arr.null_count == 0:
+        _, offsets_buf, data_buf = arr.buffers()
+        offsets = np.frombuffer(offsets_buf, dtype=np.int32)[
+            arr.offset : arr.offset + n + 1
+        ]
+        if np.all(np.diff(offsets) == _TIMESTAMP_WIDTH):
+            raw = np.frombuffer(data_buf, dtype=np.uint8)[
+                offsets[0] : offsets[-1]
+            ].reshape(n, _TIMESTAMP_WIDTH)
+            layout_ok = all(
+                np.all(raw[:, pos] == ord(sep))
+                for pos, sep in _TIMESTAMP_SEPARATORS.items()
+            ) and np.all(raw[:, _TIMESTAMP_DIGITS] - ord("0") <= 9)
+            if layout_ok:
+                return pa.array(
+                    fixed_timestamps_to_datetime64(raw), type=pa.timestamp("ns")
+                )
+    # Values that don't follow the fixed layout go through the generic parser
+    return pc.strptime(
+        arr.cast(pa.string()), format="%Y-%m-%d %H:%M:%S", unit="ns"
+    )
+
+
+def parse_fixed_timestamps(column):
+    return pa.chunked_array(
+        [_parse_fixed_timestamp_array(chunk) for chunk in column.chunks],
+        type=pa.timestamp("ns"),
+    )
+
+
+def parse_block(buf, column_names, dtype, fixed_timestamps=False):
+    column_types = arrow_column_types(dtype)
+    if fixed_timestamps:
+        # Read timestamps as raw bytes and convert them after parsing
+        timestamp_columns = [
+            name for name, t in column_types.items() if pa.types.is_timestamp(t)
+        ]
+        column_types.update({name: pa.binary() for name in timestamp_columns})
+
+    table = pa_csv.read_csv(
+        pa.BufferReader(buf),
+        read_options=pa_csv.ReadOptions(column_names=column_names, use_threads=False),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+
+    if fixed_timestamps:
+        for name in timestamp_columns:
+            table = table.set_column(
+                table.schema.get_field_index(name),
+                name,
+                parse_fixed_timestamps(table.column(name)),
+            )
+    df = table.to_pandas(types_mapper=_pandas_types.get)
+    # Dictionaries of Arrow blocks only contain values seen in the block,
+    # recode them to the declared categories so that all partitions agree.
+    for name in df.columns:
+        if isinstance(dtype.get(name), pandas.CategoricalDtype):
+            df[name] = df[name].astype(dtype[name])
+    return df
+
+
+def read_range(
+    filename,
+    start,
+    end,
+    column_names,
+    dtype,
+    fixed_timestamps,
+    codec=None,
+    raw_size=None,
+    skip=0,
+):
+    with open(filename, "rb") as fp:
+        fp.seek(start)
+        buf = fp.read(end - start)
+    if codec is not None:
+        buf = pa.decompress(buf, decompressed_size=raw_size, codec=codec).slice(skip)
+    return parse_block(buf, column_names, dtype, fixed_timestamps)
+
+
+def _read_ranges_ray(filename, ranges, column_names, dtype, fixed_timestamps):
+    import ray
+    from modin.distributed.dataframe.pandas import from_partitions
+
+    @ray.remote(num_returns=2)
+    def remote_read_range(start, end, *frame):
+        df = read_range(
+            filename, start, end, column_names, dtype, fixed_timestamps, *frame
+        )
+        return df, len(df)
+
+    parts, lengths = [], []
+    for r in ranges:
+        part, length = remote_read_range.remote(*r)
+        parts.append(part)
+        lengths.append(length)
+    lengths = ray.get(lengths)
+
+    # Parsed blocks stay in the object store and become row partitions of
+    # the resulting frame without a round trip through the driver.
+    return from_partitions(
+        parts,
+        axis=0,
+        index=pandas.RangeIndex(sum(lengths)),
+        columns=pandas.Index(column_names),
+        row_lengths=lengths,
+        column_widths=[len(column_names)],
+    )
+
+
+def _read_ranges_threads(
+    filename, ranges, column_names, dtype, fixed_timestamps, num_workers
+):
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        parts = list(
+            executor.map(
+                lambda r: read_range(
+                    filename, r[0], r[1], column_names, dtype, fixed_timestamps, *r[2:]
+                ),
+                ranges,
+            )
+        )
+    return pd.DataFrame(pandas.concat(parts, ignore_index=True))
+
+
+def split_file(filename, block_size=None):
+    """
+    Return column names and ranges of a CSV file that are parsed
+    independently by read_range: frames of compressed files or newline
+    aligned byte ranges of plain ones.
+    """
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE
+    frames = load_frames(filename)
+    if frames is not None:
+        return split_frames(filename, frames)
+    return split_byte_ranges(filename, block_size)
+
+
+def default_executor():
+    """Ranges are parsed by Ray tasks when Modin runs on Ray and by threads otherwise."""
+    if cfg.Engine.get() == "Ray" and cfg.StorageFormat.get() == "Pandas":
+        return "ray"
+    return "thread"
+
+
+def read_csv_chunked(
+    filename,
+    dtype,
+    block_size=None,
+    fixed_timestamps=False,
+    executor=None,
+    num_workers=None,
+):
+    """
+    Read a CSV file with a header line by splitting it into newline aligned
+    byte ranges and parsing them in parallel with the Arrow CSV engine.
+    dtype maps column names to pandas type names, "timestamp" or categorical
+    dtypes with declared categories.
+
+    With the "ray" executor every range is parsed by a Ray task and becomes
+    a partition of the resulting Modin frame. The "thread" executor parses
+    ranges in a thread pool of the current process, Arrow releases the GIL
+    while parsing. By default "ray" is used when Modin runs on Ray.
+
+    With fixed_timestamps timestamp columns are expected in the fixed
+    "YYYY-MM-DD HH:MM:SS" layout written by the generator and are converted
+    from raw bytes without generic date parsing.
+
+    Files compressed by the generator are read by frames listed in their
+    sidecar frames index instead of byte ranges, every frame is decompressed
+    by the task that parses it.
+    """
+    if executor is None:
+        executor = default_executor()
+
+    column_names, ranges = split_file(filename, block_size)
+    if executor == "ray":
+        return _read_ranges_ray(
+            filename, ranges, column_names, dtype, fixed_timestamps
+        )
+    if executor == "thread":
+        return _read_ranges_threads(
+            filename, ranges, column_names, dtype, fixed_timestamps, num_workers
+        )
+    raise ValueError(f"Unknown executor: {executor}")
+
+
+def uncompressed_size(filename):
+    frames = load_frames(filename)
+    if frames is None:
+        return os.path.getsize(filename)
+    return sum(raw_size for _, _, raw_size in frames["frames"])
+
+
+def read_throughput(filenames, seconds):
+    """
+    Return effective reading throughput in MB/s of CSV data, for compressed
+    files it is counted by the uncompressed size.
+    """
+    return sum(uncompressed_size(f) for f in filenames) / 2**20 / seconds
+
+
+def compression_ratio(filenames):
+    """Return ratio of uncompressed to compressed size, None for plain CSV files."""
+    if all(load_frames(f) is None for f in filenames):
+        return None
+    return sum(uncompressed_size(f) for f in filenames) / sum(
+        os.path.getsize(f) for f in filenames
+    )
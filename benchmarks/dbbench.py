@@ -0,0 +1,292 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import sys
+import json
+from collections import OrderedDict
+import modin.pandas as pd
+import pandas
+
+from benchmarks.checkpoint import open_checkpoints, add_saving_time
+from benchmarks.timing import measure
+from benchmarks.tracing import read_span
+from benchmarks.csv_reader import read_csv_chunked, read_throughput, compression_ratio
+from benchmarks.schema import load_schema, frame_memory
+
+PHASES = ("Reading", "Questions")
+# Groupby keeps null keys and doesn't sort groups, like db-benchmark does
+GROUPBY_ARGS = {"as_index": False, "sort": False, "observed": True, "dropna": False}
+
+
+def get_dtypes(filename, nulls=False):
+    """
+    Return dtypes of a dbbench table from the schema stored by the
+    generator. Integer columns with nulls are loaded as floats.
+    """
+    dtypes = {}
+    for name, declaration in load_schema(filename).items():
+        column_type = declaration[0]
+        if nulls and column_type == "int64":
+            column_type = "float64"
+        dtypes[name] = column_type
+    return dtypes
+
+
+def read(filename, nulls=False, reader="modin", block_size=None):
+    dtypes = get_dtypes(filename, nulls)
+
+    with read_span(filename) as attrs:
+        if reader == "chunked":
+            df = read_csv_chunked(filename, dtypes, block_size)
+        else:
+            df = pd.read_csv(filename, header=0, dtype=dtypes)
+        # String keys are grouped and joined as categoricals
+        df = df.astype(
+            {name: "category" for name, t in dtypes.items() if t == "string"}
+        )
+
+        attrs["rows"] = len(df)  # to trigger real execution on omnisci
+    return df
+
+
+def read_tables(groupby_file, x_file, small_file, medium_file, big_file, nulls, reader, block_size):
+    # Nulls are only in the groupby table and the left table of joins
+    return (
+        read(groupby_file, nulls, reader, block_size),
+        read(x_file, nulls, reader, block_size),
+        read(small_file, False, reader, block_size),
+        read(medium_file, False, reader, block_size),
+        read(big_file, False, reader, block_size),
+    )
+
+
+def groupby_q1(x):
+    # sum v1 by id1
+    ans = x.groupby("id1", **GROUPBY_ARGS).agg({"v1": "sum"})
+    ans.shape  # to trigger real execution on omnisci
+    return ans
+
+
+def groupby_q2(x):
+    # sum v1 by id1:id2
+    ans = x.groupby(["id1", "id2"], **GROUPBY_ARGS).agg({"v1": "sum"})
+    ans.shape
+    return ans
+
+
+def groupby_q3(x):
+    # sum v1 mean v3 by id3
+    ans = x.groupby("id3", **GROUPBY_ARGS).agg({"v1": "sum", "v3": "mean"})
+    ans.shape
+    return ans
+
+
+def groupby_q4(x):
+    # mean v1:v3 by id4
+    ans = x.groupby("id4", **GROUPBY_ARGS).agg(
+        {"v1": "mean", "v2": "mean", "v3": "mean"}
+    )
+    ans.shape
+    return ans
+
+
+def groupby_q5(x):
+    # sum v1:v3 by id6
+    ans = x.groupby("id6", **GROUPBY_ARGS).agg({"v1": "sum", "v2": "sum", "v3": "sum"})
+    ans.shape
+    return ans
+
+
+def groupby_q6(x):
+    # median v3 sd v3 by id4 id5
+    ans = x.groupby(["id4", "id5"], **GROUPBY_ARGS).agg({"v3": ["median", "std"]})
+    ans.shape
+    return ans
+
+
+def groupby_q7(x):
+    # max v1 - min v2 by id3
+    ans = (
+        x.groupby("id3", **GROUPBY_ARGS)
+        .agg({"v1": "max", "v2": "min"})
+        .assign(range_v1_v2=lambda df: df["v1"] - df["v2"])[["id3", "range_v1_v2"]]
+    )
+    ans.shape
+    return ans
+
+
+def groupby_q8(x):
+    # largest two v3 by id6
+    ans = (
+        x[~x["v3"].isna()][["id6", "v3"]]
+        .sort_values("v3", ascending=False)
+        .groupby("id6", sort=False, observed=True, dropna=False)
+        .head(2)
+    )
+    ans.shape
+    return ans
+
+
+def groupby_q9(x):
+    # regression v1 v2 by id2 id4, groups are pandas frames in workers
+    ans = (
+        x[["id2", "id4", "v1", "v2"]]
+        .groupby(["id2", "id4"], **GROUPBY_ARGS)
+        .apply(lambda df: pandas.Series({"r2": df["v1"].corr(df["v2"]) ** 2}))
+    )
+    ans.shape
+    return ans
+
+
+def groupby_q10(x):
+    # sum v3 count by id1:id6
+    ans = x.groupby(["id1", "id2", "id3", "id4", "id5", "id6"], **GROUPBY_ARGS).agg(
+        {"v3": "sum", "v1": "size"}
+    )
+    ans.shape
+    return ans
+
+
+def join_q1(x, small, medium, big):
+    # small inner on int
+    ans = x.merge(small, how="inner", on="id1")
+    ans.shape
+    return ans
+
+
+def join_q2(x, small, medium, big):
+    # medium inner on int
+    ans = x.merge(medium, how="inner", on="id2")
+    ans.shape
+    return ans
+
+
+def join_q3(x, small, medium, big):
+    # medium outer on int
+    ans = x.merge(medium, how="left", on="id2")
+    ans.shape
+    return ans
+
+
+def join_q4(x, small, medium, big):
+    # medium inner on factor
+    ans = x.merge(medium, how="inner", on="id5")
+    ans.shape
+    return ans
+
+
+def join_q5(x, small, medium, big):
+    # big inner on int
+    ans = x.merge(big, how="inner", on="id3")
+    ans.shape
+    return ans
+
+
+GROUPBY_QUESTIONS = (
+    groupby_q1,
+    groupby_q2,
+    groupby_q3,
+    groupby_q4,
+    groupby_q5,
+    groupby_q6,
+    groupby_q7,
+    groupby_q8,
+    groupby_q9,
+    groupby_q10,
+)
+JOIN_QUESTIONS = (join_q1, join_q2, join_q3, join_q4, join_q5)
+# Names of tables in the order of run() arguments
+TABLES = ("groupby", "x", "small", "medium", "big")
+
+
+def run_questions(groupby, x, small, medium, big, res):
+    for question in GROUPBY_QUESTIONS:
+        _, res[f"Groupby {question.__name__.split('_')[1].upper()}"] = measure(
+            question, groupby
+        )
+    for question in JOIN_QUESTIONS:
+        _, res[f"Join {question.__name__.split('_')[1].upper()}"] = measure(
+            question, x, small, medium, big
+        )
+    return res
+
+
+def hdk_warmap_query():
+    # Trigger HDK initialization by executing a quick trivial
+    # query. It is necessary for correct time measurement of ETL part.
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    df = df + 1
+    df.shape
+
+
+def run(
+    groupby_file,
+    x_file,
+    small_file,
+    medium_file,
+    big_file,
+    checkpoint_dir=None,
+    from_phase="Reading",
+    nulls=False,
+    reader="modin",
+    block_size=None,
+    report_memory=False,
+):
+    """
+    Run groupby questions over the groupby table and join questions of the
+    left table x with small, medium and big lookup tables. nulls tells
+    whether the groupby table and x have nulls.
+    """
+    data_files = [groupby_file, x_file, small_file, medium_file, big_file]
+    start, checkpoints = open_checkpoints(
+        "dbbench", PHASES, from_phase, checkpoint_dir, *data_files
+    )
+
+    res = OrderedDict()
+    # In a fresh process the trivial query initializes the engine
+    _, res["Engine init"] = measure(hdk_warmap_query)
+    if start == 0:
+        tables, res["Reading"] = measure(read_tables, *data_files, nulls, reader, block_size)
+        if reader == "chunked":
+            res["Reading throughput, MB/s"] = read_throughput(data_files, res["Reading"])
+            ratio = compression_ratio(data_files)
+            if ratio is not None:
+                res["Compression ratio"] = ratio
+        if checkpoints is not None:
+            checkpoints.save("Reading", **dict(zip(TABLES, tables)))
+    else:
+        tables = checkpoints.load("Reading", *TABLES)
+    if report_memory:
+        res["Frame memory, MB"] = sum(frame_memory(df) for df in tables)
+    run_questions(*tables, res)
+    add_saving_time(res, checkpoints)
+    return res
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(
+            f"USAGE: python dbbench.py <data files prefix>"
+        )
+        return
+    result = run(
+        *(
+            f"{sys.argv[1]}_{table}.csv"
+            for table in ("groupby", "join_x", "join_small", "join_medium", "join_big")
+        )
+    )
+    json.dump(result, sys.stdout, indent=4)
+
+
+if __name__ == "__main__":
+    main()
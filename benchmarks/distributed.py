@@ -0,0 +1,182 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import time
+from collections import OrderedDict
+
+import pandas
+import ray
+from ray.util.scheduling_strategies import NodeAffinitySchedulingStrategy
+from modin.distributed.dataframe.pandas import from_partitions
+
+from benchmarks.csv_reader import split_byte_ranges, read_range, DEFAULT_BLOCK_SIZE
+
+# Keeps processes of a local test cluster alive while the benchmark runs
+_local_cluster = None
+
+
+def start_local_cluster(num_nodes, num_cpus):
+    """
+    Start a Ray cluster of num_nodes nodes on this host, each node running
+    in its own set of processes. Returns the cluster address.
+    """
+    global _local_cluster
+    from ray.cluster_utils import Cluster
+
+    _local_cluster = Cluster()
+    cpus_per_node = max(num_cpus // num_nodes, 1)
+    for _ in range(num_nodes):
+        _local_cluster.add_node(num_cpus=cpus_per_node)
+    _local_cluster.wait_for_nodes()
+    return _local_cluster.address
+
+
+def init_cluster(address):
+    if not ray.is_initialized():
+        ray.init(
+            address=address,
+            runtime_env={"env_vars": {"__MODIN_AUTOIMPORT_PANDAS__": "1"}},
+        )
+    # Modin picks up the Ray instance that is already initialized
+    os.environ["MODIN_ENGINE"] = "ray"
+
+
+def cluster_nodes():
+    return sorted(
+        (node for node in ray.nodes() if node["Alive"]), key=lambda node: node["NodeID"]
+    )
+
+
+def _on_node(node):
+    return NodeAffinitySchedulingStrategy(node_id=node["NodeID"], soft=False)
+
+
+def split_records(records, num_shards):
+    return [
+        records // num_shards + (1 if i < records % num_shards else 0)
+        for i in range(num_shards)
+    ]
+
+
+def generate_shards(generator_class, output_file_name, records, reuse, nodes):
+    """
+    Generate one shard of the dataset on every node. Shards are written to
+    the same absolute path on the node local file systems. Returns shard
+    file names and per-node generation times.
+    """
+    output_file_name = os.path.abspath(output_file_name)
+
+    @ray.remote
+    def generate_shard(shard, shard_records):
+        t0 = time.time()
+        gen = generator_class(output_file_name, reuse, False, 1)
+        shard_file = gen.generate_shard(shard_records, shard)
+        return shard_file, time.time() - t0
+
+    return ray.get(
+        [
+            generate_shard.options(scheduling_strategy=_on_node(node)).remote(
+                shard, shard_records
+            )
+            for shard, (node, shard_records) in enumerate(
+                zip(nodes, split_records(records, len(nodes)))
+            )
+        ]
+    )
+
+
+def read_shards(shard_files, nodes, dtype, block_size=None):
+    """
+    Read shards so that every node parses only its local shard. Each shard
+    is split into byte ranges on its node and every range is parsed by a
+    task pinned to that node. The parsed blocks become row partitions of
+    the resulting Modin frame.
+
+    Returns the frame and per-node reading statistics.
+    """
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE
+
+    split_remote = ray.remote(split_byte_ranges)
+
+    @ray.remote(num_returns=2)
+    def read_range_remote(filename, start, end, column_names):
+        df = read_range(filename, start, end, column_names, dtype, False)
+        return df, (len(df), time.time())
+
+    t0 = time.time()
+    splits = ray.get(
+        [
+            split_remote.options(scheduling_strategy=_on_node(node)).remote(
+                shard_file, block_size
+            )
+            for node, shard_file in zip(nodes, shard_files)
+        ]
+    )
+
+    parts, node_infos = [], []
+    for node, shard_file, (column_names, ranges) in zip(nodes, shard_files, splits):
+        node_parts, node_infos_refs = [], []
+        for start, end in ranges:
+            part, info = read_range_remote.options(
+                scheduling_strategy=_on_node(node)
+            ).remote(shard_file, start, end, column_names)
+            node_parts.append(part)
+            node_infos_refs.append(info)
+        parts.extend(node_parts)
+        node_infos.append(
+            (node, sum(end - start for start, end in ranges), node_infos_refs)
+        )
+
+    stats = []
+    lengths = []
+    for node, nbytes, info_refs in node_infos:
+        infos = ray.get(info_refs)
+        lengths.extend(length for length, _ in infos)
+        # Finish times come from node clocks, which are expected to be synchronized
+        seconds = max((finished for _, finished in infos), default=t0) - t0
+        stats.append(
+            {
+                "node": node["NodeManagerAddress"],
+                "node_id": node["NodeID"],
+                "rows": sum(length for length, _ in infos),
+                "bytes": nbytes,
+                "seconds": seconds,
+            }
+        )
+
+    df = from_partitions(
+        parts,
+        axis=0,
+        index=pandas.RangeIndex(sum(lengths)),
+        row_lengths=lengths,
+    )
+    return df, stats
+
+
+def _throughput(size, seconds):
+    # Empty shards are read instantly, their throughput is reported as 0
+    return size / 2**20 / seconds if seconds > 0 else 0.0
+
+
+def throughput_results(stats, seconds):
+    res = OrderedDict()
+    for i, node_stats in enumerate(stats):
+        res[f"Reading throughput node {i} ({node_stats['node']}), MB/s"] = _throughput(
+            node_stats["bytes"], node_stats["seconds"]
+        )
+    res["Reading throughput, MB/s"] = _throughput(
+        sum(node_stats["bytes"] for node_stats in stats), seconds
+    )
+    return res
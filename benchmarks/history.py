@@ -0,0 +1,167 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import json
+import time
+import hashlib
+import statistics
+import subprocess
+from collections import OrderedDict
+
+# Launcher options that only control where and how results are reported and
+# don't change what is measured. Cluster address of a local cluster changes
+# from run to run, distributed runs differ from local ones by shard files of
+# their dataset.
+_REPORTING_OPTIONS = {
+    "cluster_address",
+    "json",
+    "output",
+    "history",
+    "compare_history",
+    "regression_sigmas",
+    "regression_threshold",
+    "profile",
+    "profile_top",
+    "trace",
+    "reuse_dataset_files",
+    "autotune_trials",
+    "tuning_profile",
+    "ignore_tuning_profile",
+}
+# Options that select benchmarks to run, history is kept per benchmark
+_SELECTION_OPTIONS = {"mode"}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def config_hash(options: dict):
+    """Hash of launcher options that affect measurements."""
+    config = {
+        k: v
+        for k, v in options.items()
+        if k not in _REPORTING_OPTIONS and k not in _SELECTION_OPTIONS
+    }
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def dataset_hash(*filenames):
+    # Generators are seeded, so the same options produce files of the same
+    # size and contents. Unlike checkpoints, runs over regenerated files have
+    # to match, so modification times are not hashed.
+    h = hashlib.sha1()
+    for filename in filenames:
+        size = os.path.getsize(filename) if os.path.exists(filename) else -1
+        h.update(f"{os.path.basename(filename)}:{size}".encode())
+    return h.hexdigest()[:16]
+
+
+def run_key(engine: str, cpus: int, options: dict):
+    return OrderedDict(
+        revision=git_revision(),
+        engine=engine,
+        cpus=cpus,
+        config=config_hash(options),
+    )
+
+
+def append_history(filename: str, key: dict, benchmark: str, dataset: str, results: dict):
+    record = OrderedDict(
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        benchmark=benchmark,
+        dataset=dataset,
+        **key,
+        results=results,
+    )
+    with open(filename, "a") as fp:
+        fp.write(json.dumps(record) + "\n")
+
+
+def load_history(filename: str):
+    if not os.path.exists(filename):
+        return []
+    with open(filename) as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def higher_is_better(phase: str):
+    return phase.endswith((", MB/s", ", queries/s", ", clients")) or phase == "Compression ratio"
+
+
+def compare_results(
+    history: list,
+    key: dict,
+    benchmark: str,
+    dataset: str,
+    results: dict,
+    sigmas: float = 3.0,
+    threshold: float = 0.05,
+):
+    """
+    Compare numeric results of a benchmark with earlier runs of the same
+    benchmark, engine, CPU count, options and dataset. A phase regresses
+    when it is worse than the baseline mean by more than sigmas standard
+    deviations of the baseline runs and by more than threshold relative to
+    the mean, the latter keeps phases with a very stable baseline from
+    being flagged for noise. Returns a list of (phase, value, mean, stdev,
+    runs, regressed) tuples.
+    """
+    baseline = [
+        record["results"]
+        for record in history
+        if record["benchmark"] == benchmark
+        and record["dataset"] == dataset
+        and all(record[k] == v for k, v in key.items() if k != "revision")
+    ]
+
+    rows = []
+    for phase, value in results.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        values = [
+            r[phase]
+            for r in baseline
+            if isinstance(r.get(phase), (int, float))
+        ]
+        if not values:
+            continue
+        mean = statistics.fmean(values)
+        stdev = statistics.stdev(values) if len(values) > 1 else 0.0
+        margin = max(sigmas * stdev, threshold * abs(mean))
+        if higher_is_better(phase):
+            regressed = value < mean - margin
+        else:
+            regressed = value > mean + margin
+        rows.append((phase, value, mean, stdev, len(values), regressed))
+    return rows
+
+
+def print_comparison(benchmark: str, rows: list):
+    print(f"Comparison of {benchmark} results with history:")
+    for phase, value, mean, stdev, runs, regressed in rows:
+        change = (value - mean) / mean * 100 if mean else 0.0
+        print(
+            f"  {phase}: {value:.3f} vs {mean:.3f} ± {stdev:.3f} over {runs} runs"
+            f" ({change:+.1f}%){' REGRESSION' if regressed else ''}"
+        )
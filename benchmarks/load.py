@@ -0,0 +1,88 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Throughput has to grow by at least this factor when clients are added for
+# the engine not to be considered saturated.
+SATURATION_GAIN = 1.1
+
+
+def client_loop(queries: list, offset: int, deadline: float, latencies: list):
+    """
+    Run queries round robin until deadline, at least one query is run. Every
+    client starts at its own offset, so that different queries run
+    concurrently.
+    """
+    i = offset
+    while True:
+        _, query = queries[i % len(queries)]
+        t0 = time.time()
+        query()
+        t1 = time.time()
+        latencies.append(t1 - t0)
+        if t1 >= deadline:
+            break
+        i += 1
+
+
+def run_clients(queries: list, clients: int, duration: float):
+    """
+    Run queries from a number of concurrent clients for duration seconds.
+    Queries that are still running at the deadline are completed and counted.
+    """
+    latencies = [[] for _ in range(clients)]
+    t0 = time.time()
+    threads = [
+        threading.Thread(
+            target=client_loop,
+            args=(queries, i, t0 + duration, latencies[i]),
+        )
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate([np.array(x) for x in latencies]), time.time() - t0
+
+
+def saturation_point(qps: OrderedDict):
+    """Return number of clients after which adding clients stops raising throughput."""
+    counts = list(qps.keys())
+    for clients, more_clients in zip(counts, counts[1:]):
+        if qps[more_clients] < qps[clients] * SATURATION_GAIN:
+            return clients
+    return counts[-1]
+
+
+def run_load(queries: list, clients_list: list, duration: float):
+    """
+    Measure throughput and latency of queries, a list of (name, callable)
+    pairs over a shared dataset, with every number of concurrent clients
+    from clients_list.
+    """
+    res = OrderedDict()
+    qps = OrderedDict()
+    for clients in clients_list:
+        print(f"Running {clients} concurrent clients for {duration} seconds")
+        latencies, seconds = run_clients(queries, clients, duration)
+        qps[clients] = len(latencies) / seconds
+        res[f"{clients} clients, queries/s"] = qps[clients]
+        for p in (50, 95, 99):
+            res[f"{clients} clients, p{p} latency"] = float(np.percentile(latencies, p))
+    res["Saturation point, clients"] = saturation_point(qps)
+    return res
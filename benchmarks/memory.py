@@ -0,0 +1,63 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import re
+import json
+
+import ray
+
+_SPILLED_RE = re.compile(r"Spilled (\d+) MiB")
+# Share of the memory budget given to the Ray object store, the rest is left
+# for heaps of workers and the driver, which hold pandas frames of tasks,
+# conversions to NumPy and ML models
+OBJECT_STORE_SHARE = 0.6
+
+
+def init_memory_budget(num_cpus, budget, spill_dir=None):
+    """
+    Start Ray with an object store limited to OBJECT_STORE_SHARE of budget
+    bytes and return its size. Partitions of Modin frames that don't fit into
+    the object store are spilled to spill_dir, or to the Ray session
+    directory by default, and restored when tasks need them, so phases run
+    out of core with the same results. Heaps are not limited by Ray, the
+    rest of the budget is only reserved for them.
+    """
+    object_store = int(budget * OBJECT_STORE_SHARE)
+    system_config = {}
+    if spill_dir is not None:
+        os.makedirs(spill_dir, exist_ok=True)
+        system_config["object_spilling_config"] = json.dumps(
+            {"type": "filesystem", "params": {"directory_path": spill_dir}}
+        )
+    ray.init(
+        num_cpus=num_cpus,
+        object_store_memory=object_store,
+        _system_config=system_config,
+        runtime_env={"env_vars": {"__MODIN_AUTOIMPORT_PANDAS__": "1"}},
+    )
+    # Modin picks up the Ray instance that is already initialized
+    os.environ["MODIN_ENGINE"] = "ray"
+    os.environ["MODIN_MEMORY"] = str(object_store)
+    return object_store
+
+
+def spilled_bytes():
+    """Total size of objects spilled by the Ray object store so far."""
+    try:
+        from ray._private.internal_api import memory_summary
+    except ImportError:
+        from ray.internal.internal_api import memory_summary
+
+    match = _SPILLED_RE.search(memory_summary(stats_only=True))
+    return int(match.group(1)) * 2**20 if match is not None else 0
@@ -11,10 +11,13 @@
 # ANY KIND, either express or implied. See the License for the specific language
 # governing permissions and limitations under the License.
 
+import os
 import sys
-import time
 import json
+import hashlib
+import weakref
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 import modin.pandas as pd
 
@@ -27,6 +30,25 @@ sklearnex.patch_sklearn()
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 
+from benchmarks.checkpoint import open_checkpoints, add_saving_time
+from benchmarks.timing import measure
+from benchmarks.tracing import span, read_span
+from benchmarks.csv_reader import read_csv_chunked, read_throughput, compression_ratio
+from benchmarks.schema import load_schema, merge_schemas, compact_dtypes
+
+PHASES = ("Reading", "ETL", "ML")
+
+
+AGGS = {
+    "passband": ["mean"],
+    "flux": ["min", "max", "mean", "skew"],
+    "flux_err": ["min", "max", "mean"],
+    "detected": ["mean"],
+    "mjd": ["max", "min"],
+    "flux_ratio_sq": ["sum"],
+    "flux_by_flux_ratio_sq": ["sum"],
+}
+
 
 ################ helper functions ###############################
 def create_dtypes():
@@ -63,6 +85,35 @@ def create_dtypes():
     return dtypes, meta_dtypes
 
 
+def compact_plasticc_dtypes(dtypes, meta_dtypes, data_files, metadata_files):
+    # Training and test sets are loaded with the same dtypes, so they have to
+    # hold value ranges of both files
+    data_schema = merge_schemas(*[load_schema(f) for f in data_files])
+    metadata_schema = merge_schemas(*[load_schema(f) for f in metadata_files])
+    return (
+        OrderedDict(compact_dtypes(dtypes, data_schema)),
+        OrderedDict(compact_dtypes(meta_dtypes, metadata_schema)),
+    )
+
+
+def get_dtypes(
+    training_set_file,
+    test_set_file,
+    training_set_metadata_file,
+    test_set_metadata_file,
+    compact=False,
+):
+    dtypes, meta_dtypes = create_dtypes()
+    if compact:
+        dtypes, meta_dtypes = compact_plasticc_dtypes(
+            dtypes,
+            meta_dtypes,
+            [training_set_file, test_set_file],
+            [training_set_metadata_file, test_set_metadata_file],
+        )
+    return dtypes, meta_dtypes
+
+
 def trigger_read_op(dfs: tuple):
     for df in dfs:
         df.shape  # to trigger real execution
@@ -83,16 +134,9 @@ def ravel_column_names(cols):
     return ["%s_%s" % (i, j) for i, j in zip(d0, d1)]
 
 
-def measure(func, *args, **kw):
-    t0 = time.time()
-    res = func(*args, **kw)
-    t1 = time.time()
-    return res, t1 - t0
-
-
-def all_etl(train, train_meta, test, test_meta):
-    train_final = etl(train, train_meta)
-    test_final = etl(test, test_meta)
+def all_etl(train, train_meta, test, test_meta, groupby_impl="modin"):
+    train_final = etl(train, train_meta, groupby_impl)
+    test_final = etl(test, test_meta, groupby_impl)
     return (train_final, test_final)
 
 
@@ -117,35 +161,170 @@ def split_step(train_final, test_final):
     return X_train, y_train, X_test, y_test, Xt, classes, class_weights
 
 
-def multi_weighted_logloss(y_true, y_preds, classes, class_weights):
+def logloss_label_stats(y_true, classes, class_weights):
+    y_idx = np.asarray(y_true).astype(np.intp)
+    nb_pos = np.bincount(y_idx, minlength=len(classes)).astype(float)
+    class_arr = np.array(
+        [class_weights[k] for k in sorted(class_weights.keys())], dtype=float
+    )
+    return y_idx, nb_pos, class_arr
+
+
+def multi_weighted_logloss(y_true, y_preds, classes, class_weights, label_stats=None):
     """
     refactor from
     @author olivier https://www.kaggle.com/ogrellier
     multi logloss for PLAsTiCC challenge
     """
-    y_p = y_preds.reshape(y_true.shape[0], len(classes), order="F")
-    y_ohe = pd.get_dummies(y_true)
-    y_p = np.clip(a=y_p, a_min=1e-15, a_max=1 - 1e-15)
-    y_p_log = np.log(y_p)
-    y_log_ones = np.sum(y_ohe.values * y_p_log, axis=0)
-    nb_pos = y_ohe.sum(axis=0).values.astype(float)
-    class_arr = np.array([class_weights[k] for k in sorted(class_weights.keys())])
+    if label_stats is None:
+        label_stats = logloss_label_stats(y_true, classes, class_weights)
+    y_idx, nb_pos, class_arr = label_stats
+
+    y_p = y_preds.reshape(y_idx.shape[0], len(classes), order="F")
+    # Only the predicted probability of the true class contributes to the
+    # loss, so pick it by fancy indexing instead of multiplying by a one-hot
+    # matrix and sum it up per class with bincount.
+    y_p = np.clip(a=y_p[np.arange(y_idx.shape[0]), y_idx], a_min=1e-15, a_max=1 - 1e-15)
+    y_log_ones = np.bincount(y_idx, weights=np.log(y_p), minlength=len(classes))
     y_w = y_log_ones * class_arr / nb_pos
 
     loss = -np.sum(y_w) / np.sum(class_arr)
     return loss
 
 
-def xgb_multi_weighted_logloss(y_predicted, y_true, classes, class_weights):
+def xgb_multi_weighted_logloss(
+    y_predicted, y_true, classes, class_weights, label_stats_cache
+):
+    # Labels of a DMatrix don't change between boosting rounds, so label
+    # indices and per-class counts are computed once per DMatrix.
+    label_stats = label_stats_cache.get(y_true)
+    if label_stats is None:
+        label_stats = logloss_label_stats(y_true.get_label(), classes, class_weights)
+        label_stats_cache[y_true] = label_stats
     loss = multi_weighted_logloss(
-        y_true.get_label(), y_predicted, classes, class_weights
+        None, y_predicted, classes, class_weights, label_stats
     )
     return "wloss", loss
 
 
+def modin_groupby_agg(df, aggs):
+    agg_df = df.groupby("object_id", sort=False).agg(aggs)
+    agg_df.columns = ravel_column_names(agg_df.columns)
+    return agg_df
+
+
+def segment_starts(keys):
+    """Find offsets where runs of equal consecutive keys start."""
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def segment_skew(values, starts, counts):
+    # Values are shifted by the first element of each segment before the
+    # power sums are taken, so that the one-pass central moments below
+    # don't lose precision on large flux offsets.
+    shifted = values.astype(np.float64) - np.repeat(
+        values[starts].astype(np.float64), counts
+    )
+    s1 = np.add.reduceat(shifted, starts)
+    s2 = np.add.reduceat(shifted * shifted, starts)
+    s3 = np.add.reduceat(shifted * shifted * shifted, starts)
+
+    n = counts.astype(np.float64)
+    m2 = s2 - s1 * s1 / n
+    m3 = s3 - 3 * s1 * s2 / n + 2 * s1 * s1 * s1 / (n * n)
+    # Same conventions as pandas nanskew: floating point noise in m2 means
+    # a constant group with zero skew, less than three values gives NaN.
+    m2[np.abs(m2) < 1e-14] = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skew = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+    skew[m2 == 0] = 0
+    skew[n < 3] = np.nan
+    return skew
+
+
+def segment_agg(df, aggs):
+    """
+    Groupby aggregation for frames where rows of each object_id are stored
+    contiguously. Run boundaries are found once and every aggregate is
+    computed with reduceat kernels instead of hashing the keys.
+    """
+    keys = df["object_id"].to_numpy()
+    starts = segment_starts(keys)
+    order = None
+    if len(np.unique(keys[starts])) != len(starts):
+        # Some object occurs in several runs, like in files of older generator
+        # versions with repeated object ids. Rows are stably sorted by key to
+        # make every object a single run.
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = segment_starts(keys)
+    counts = np.diff(np.append(starts, len(keys)))
+
+    data = OrderedDict()
+    for column, funcs in aggs.items():
+        values = df[column].to_numpy()
+        if order is not None:
+            values = values[order]
+        for func in funcs:
+            if func == "min":
+                result = np.minimum.reduceat(values, starts)
+            elif func == "max":
+                result = np.maximum.reduceat(values, starts)
+            elif func == "sum":
+                result = np.add.reduceat(values, starts, dtype=np.float64)
+            elif func == "mean":
+                result = np.add.reduceat(values, starts, dtype=np.float64) / counts
+            elif func == "skew":
+                result = segment_skew(values, starts, counts)
+            else:
+                raise ValueError(f"Unsupported segment aggregation: {func}")
+            data[f"{column}_{func}"] = result
+
+    index = keys[starts]
+    if order is not None:
+        # Groups are put back in the order of first occurrence of their keys,
+        # like groupby with sort=False returns them
+        first = np.argsort(order[starts], kind="stable")
+        index = index[first]
+        data = OrderedDict((name, result[first]) for name, result in data.items())
+    return pd.DataFrame(data, index=pd.Index(index, name="object_id"))
+
+
+groupby_impls = {
+    "modin": modin_groupby_agg,
+    "segment": segment_agg,
+}
+
+
+def validate_segment_agg(df):
+    # df must already have the derived flux columns added by etl()
+    expected = modin_groupby_agg(df, AGGS)
+    actual = segment_agg(df, AGGS)
+    assert list(expected.columns) == list(actual.columns)
+    assert np.array_equal(expected.index.to_numpy(), actual.index.to_numpy())
+    assert np.allclose(
+        expected.to_numpy(dtype=np.float64),
+        actual.to_numpy(dtype=np.float64),
+        rtol=1e-4,
+        equal_nan=True,
+    ), "Segment aggregation results differ from Modin groupby"
+
+
 ################ helper functions ###############################
 
 
+def read_file(filename, dtype, reader, block_size):
+    with read_span(filename) as attrs:
+        if reader == "chunked":
+            df = read_csv_chunked(filename, dtype, block_size)
+        else:
+            df = pd.read_csv(filename, dtype=dtype, header=0)
+        attrs["rows"] = len(df)
+    return df
+
+
 def read(
     training_set_filename,
     test_set_filename,
@@ -153,13 +332,15 @@ def read(
     test_set_metadata_filename,
     dtypes,
     meta_dtypes,
+    reader="modin",
+    block_size=None,
 ):
-    train = pd.read_csv(training_set_filename, dtype=dtypes, header=0)
-    test = pd.read_csv(test_set_filename, dtype=dtypes, header=0)
+    train = read_file(training_set_filename, dtypes, reader, block_size)
+    test = read_file(test_set_filename, dtypes, reader, block_size)
 
-    train_meta = pd.read_csv(training_set_metadata_filename, dtype=meta_dtypes, header=0)
+    train_meta = read_file(training_set_metadata_filename, meta_dtypes, reader, block_size)
     target = meta_dtypes.pop("target")
-    test_meta = pd.read_csv(test_set_metadata_filename, dtype=meta_dtypes, header=0)
+    test_meta = read_file(test_set_metadata_filename, meta_dtypes, reader, block_size)
     meta_dtypes["target"] = target
 
     dfs = (train, train_meta, test, test_meta)
@@ -167,25 +348,96 @@ def read(
     return dfs
 
 
-def etl(df, df_meta):
+def read_branch(
+    data_filename, metadata_filename, dtypes, meta_dtypes, reader, block_size
+):
+    df = read_file(data_filename, dtypes, reader, block_size)
+    df_meta = read_file(metadata_filename, meta_dtypes, reader, block_size)
+    return trigger_read_op((df, df_meta))
+
+
+def etl_branch(
+    data_filename,
+    metadata_filename,
+    dtypes,
+    meta_dtypes,
+    groupby_impl,
+    reader,
+    block_size,
+):
+    res = OrderedDict()
+    (df, df_meta), res["Reading"] = measure(
+        read_branch,
+        data_filename,
+        metadata_filename,
+        dtypes,
+        meta_dtypes,
+        reader,
+        block_size,
+    )
+    df_final, res["ETL"] = measure(etl, df, df_meta, groupby_impl)
+    return df, df_final, res
+
+
+def pipelined_etl(
+    training_set_filename,
+    test_set_filename,
+    training_set_metadata_filename,
+    test_set_metadata_filename,
+    dtypes,
+    meta_dtypes,
+    groupby_impl="modin",
+    reader="modin",
+    block_size=None,
+):
+    """
+    Run reading and ETL of the training and test sets as two concurrent
+    branches, so that reading of the large test set overlaps with ETL on
+    the training set. Both branches submit work to the same engine, which
+    shares its workers between them.
+    """
+    test_meta_dtypes = OrderedDict(
+        (k, v) for k, v in meta_dtypes.items() if k != "target"
+    )
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        train_future = executor.submit(
+            etl_branch,
+            training_set_filename,
+            training_set_metadata_filename,
+            dtypes,
+            meta_dtypes,
+            groupby_impl,
+            reader,
+            block_size,
+        )
+        test_future = executor.submit(
+            etl_branch,
+            test_set_filename,
+            test_set_metadata_filename,
+            dtypes,
+            test_meta_dtypes,
+            groupby_impl,
+            reader,
+            block_size,
+        )
+        train, train_final, train_res = train_future.result()
+        test, test_final, test_res = test_future.result()
+
+    res = OrderedDict()
+    for branch, branch_res in (("train", train_res), ("test", test_res)):
+        for phase, value in branch_res.items():
+            res[f"{phase} ({branch})"] = value
+    return train, test, train_final, test_final, res
+
+
+def etl(df, df_meta, groupby_impl="modin"):
     # workaround for both Modin_on_ray and Modin_on_omnisci modes. Eventually this should be fixed
     df["flux_ratio_sq"] = (df["flux"] / df["flux_err"]) * (
         df["flux"] / df["flux_err"]
     )  # np.power(df["flux"] / df["flux_err"], 2.0)
     df["flux_by_flux_ratio_sq"] = df["flux"] * df["flux_ratio_sq"]
 
-    aggs = {
-        "passband": ["mean"],
-        "flux": ["min", "max", "mean", "skew"],
-        "flux_err": ["min", "max", "mean"],
-        "detected": ["mean"],
-        "mjd": ["max", "min"],
-        "flux_ratio_sq": ["sum"],
-        "flux_by_flux_ratio_sq": ["sum"],
-    }
-    agg_df = df.groupby("object_id", sort=False).agg(aggs)
-
-    agg_df.columns = ravel_column_names(agg_df.columns)
+    agg_df = groupby_impls[groupby_impl](df, AGGS)
 
     agg_df["flux_diff"] = agg_df["flux_max"] - agg_df["flux_min"]
     agg_df["flux_dif2"] = agg_df["flux_diff"] / agg_df["flux_mean"]
@@ -207,10 +459,59 @@ def etl(df, df_meta):
     return df_meta
 
 
-def ml(train_final, test_final):
-    X_train, y_train, X_test, y_test, Xt, classes, class_weights = split_step(
-        train_final, test_final
+def arrays_hash(*arrays):
+    h = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype}{arr.shape}".encode())
+        h.update(arr.data)
+    return h.hexdigest()
+
+
+def build_dmatrices(X_train, y_train, X_test, y_test, Xt, dmatrix_type, cache_dir):
+    """
+    Build training, validation and test matrices. "quantile" builds
+    QuantileDMatrix objects that sketch and bin the data once, with the
+    validation and test matrices reusing the training set cuts. Plain
+    DMatrix objects can be cached in cache_dir in XGBoost binary format,
+    keyed by a hash of the ETL output, so reruns over the same ETL output
+    only load them. XGBoost can't serialize QuantileDMatrix, so it can't be
+    cached.
+    """
+    if dmatrix_type == "quantile":
+        if cache_dir is not None:
+            raise ValueError("QuantileDMatrix can't be cached")
+        dtrain = xgb.QuantileDMatrix(X_train, label=y_train)
+        dvalid = xgb.QuantileDMatrix(X_test, label=y_test, ref=dtrain)
+        dtest = xgb.QuantileDMatrix(Xt, ref=dtrain)
+        return dtrain, dvalid, dtest
+
+    if cache_dir is not None:
+        key = arrays_hash(X_train, y_train, X_test, y_test, Xt)
+        paths = [
+            os.path.join(cache_dir, f"plasticc_{key}_{name}.buffer")
+            for name in ("train", "valid", "test")
+        ]
+        if all(os.path.exists(path) for path in paths):
+            return tuple(xgb.DMatrix(path) for path in paths)
+
+    dmatrices = (
+        xgb.DMatrix(data=X_train, label=y_train),
+        xgb.DMatrix(data=X_test, label=y_test),
+        xgb.DMatrix(data=Xt),
     )
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        for dmatrix, path in zip(dmatrices, paths):
+            dmatrix.save_binary(path)
+    return dmatrices
+
+
+def ml(train_final, test_final, dmatrix_type="dmatrix", dmatrix_cache_dir=None):
+    with span("Split", rows=len(train_final)):
+        X_train, y_train, X_test, y_test, Xt, classes, class_weights = split_step(
+            train_final, test_final
+        )
 
     cpu_params = {
         "objective": "multi:softprob",
@@ -224,55 +525,178 @@ def ml(train_final, test_final):
     }
 
     func_loss = partial(
-        xgb_multi_weighted_logloss, classes=classes, class_weights=class_weights
+        xgb_multi_weighted_logloss,
+        classes=classes,
+        class_weights=class_weights,
+        label_stats_cache=weakref.WeakKeyDictionary(),
     )
 
-    dtrain = xgb.DMatrix(data=X_train, label=y_train)
-    dvalid = xgb.DMatrix(data=X_test, label=y_test)
-    dtest = xgb.DMatrix(data=Xt)
+    (dtrain, dvalid, dtest), dmatrix_time = measure(
+        build_dmatrices,
+        X_train,
+        y_train,
+        X_test,
+        y_test,
+        Xt,
+        dmatrix_type,
+        dmatrix_cache_dir,
+    )
 
     watchlist = [(dvalid, "eval"), (dtrain, "train")]
 
-    clf = xgb.train(
-        cpu_params,
-        dtrain=dtrain,
-        num_boost_round=60,
-        evals=watchlist,
-        feval=func_loss,
-        early_stopping_rounds=10,
-        verbose_eval=None,
-    )
+    with span("Train", rows=len(y_train), bytes=X_train.nbytes):
+        clf = xgb.train(
+            cpu_params,
+            dtrain=dtrain,
+            num_boost_round=60,
+            evals=watchlist,
+            feval=func_loss,
+            early_stopping_rounds=10,
+            verbose_eval=None,
+        )
 
-    yp = clf.predict(dvalid)
-    cpu_loss = multi_weighted_logloss(y_test, yp, classes, class_weights)
-    ysub = clf.predict(dtest)  # noqa: F841 (unused variable)
+    with span("Validate", rows=len(y_test)):
+        yp = clf.predict(dvalid)
+        cpu_loss = multi_weighted_logloss(y_test, yp, classes, class_weights)
+    with span("Predict", rows=len(Xt)):
+        ysub = clf.predict(dtest)  # noqa: F841 (unused variable)
 
-    return cpu_loss
+    return cpu_loss, dmatrix_time
 
 
 def run(
-    training_set_file, test_set_file, training_set_metadata_file, test_set_metadata_file
+    training_set_file,
+    test_set_file,
+    training_set_metadata_file,
+    test_set_metadata_file,
+    groupby_impl="modin",
+    validate_groupby=False,
+    pipelined=False,
+    dmatrix_type="dmatrix",
+    dmatrix_cache_dir=None,
+    checkpoint_dir=None,
+    from_phase="Reading",
+    reader="modin",
+    block_size=None,
+    compact=False,
 ):
-    dtypes, meta_dtypes = create_dtypes()
-
-    hdk_warmap_query()
+    """
+    Run Plasticc benchmark over data and metadata files of training and
+    test sets, or over frames generated in memory in place of them. Frames
+    are expected to have dtypes of get_dtypes(), there is no Reading phase
+    and checkpoints are not used.
+    """
+    in_memory = isinstance(training_set_file, pd.DataFrame)
+    if in_memory:
+        if pipelined:
+            raise ValueError("Pipelined mode overlaps reading with ETL, it requires data files")
+        start, checkpoints = 0, None
+    else:
+        if pipelined and checkpoint_dir is not None:
+            raise ValueError("Pipelined mode overlaps reading with ETL, so phases can't be checkpointed")
+        start, checkpoints = open_checkpoints(
+            "plasticc",
+            PHASES,
+            from_phase,
+            checkpoint_dir,
+            training_set_file,
+            test_set_file,
+            training_set_metadata_file,
+            test_set_metadata_file,
+        )
+        dtypes, meta_dtypes = get_dtypes(
+            training_set_file,
+            test_set_file,
+            training_set_metadata_file,
+            test_set_metadata_file,
+            compact,
+        )
 
     res = OrderedDict()
-    (train, train_meta, test, test_meta), res["Reading"] = measure(
-        read,
-        training_set_file,
-        test_set_file,
-        training_set_metadata_file,
-        test_set_metadata_file,
-        dtypes,
-        meta_dtypes,
-    )
-    (train_final, test_final), res["ETL"] = measure(
-        all_etl, train, train_meta, test, test_meta
+    # In a fresh process the trivial query initializes the engine
+    _, res["Engine init"] = measure(hdk_warmap_query)
+    if pipelined and start == 0:
+        (train, test, train_final, test_final, branch_res), res[
+            "Reading and ETL (critical path)"
+        ] = measure(
+            pipelined_etl,
+            training_set_file,
+            test_set_file,
+            training_set_metadata_file,
+            test_set_metadata_file,
+            dtypes,
+            meta_dtypes,
+            groupby_impl,
+            reader,
+            block_size,
+        )
+        res.update(branch_res)
+    else:
+        if in_memory:
+            train, test, train_meta, test_meta = (
+                training_set_file,
+                test_set_file,
+                training_set_metadata_file,
+                test_set_metadata_file,
+            )
+        elif start == 0:
+            (train, train_meta, test, test_meta), res["Reading"] = measure(
+                read,
+                training_set_file,
+                test_set_file,
+                training_set_metadata_file,
+                test_set_metadata_file,
+                dtypes,
+                meta_dtypes,
+                reader,
+                block_size,
+            )
+            if reader == "chunked":
+                data_files = [
+                    training_set_file,
+                    test_set_file,
+                    training_set_metadata_file,
+                    test_set_metadata_file,
+                ]
+                res["Reading throughput, MB/s"] = read_throughput(
+                    data_files, res["Reading"]
+                )
+                ratio = compression_ratio(data_files)
+                if ratio is not None:
+                    res["Compression ratio"] = ratio
+            if checkpoints is not None:
+                checkpoints.save(
+                    "Reading",
+                    train=train,
+                    train_meta=train_meta,
+                    test=test,
+                    test_meta=test_meta,
+                )
+        elif start == 1:
+            train, train_meta, test, test_meta = checkpoints.load(
+                "Reading", "train", "train_meta", "test", "test_meta"
+            )
+
+        if start <= 1:
+            (train_final, test_final), res["ETL"] = measure(
+                all_etl, train, train_meta, test, test_meta, groupby_impl
+            )
+
+    if start <= 1:
+        if checkpoints is not None:
+            checkpoints.save("ETL", train_final=train_final, test_final=test_final)
+        if validate_groupby:
+            validate_segment_agg(train)
+            validate_segment_agg(test)
+    else:
+        train_final, test_final = checkpoints.load("ETL", "train_final", "test_final")
+
+    (cpu_loss, res["DMatrix"]), res["ML"] = measure(
+        ml, train_final, test_final, dmatrix_type, dmatrix_cache_dir
     )
-    cpu_loss, res["ML"] = measure(ml, train_final, test_final)
 
     # print("validation cpu_loss:", cpu_loss)
+    add_saving_time(res, checkpoints)
     return res
 
 
@@ -0,0 +1,148 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import sys
+import cProfile
+import pstats
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class StackSampler(threading.Thread):
+    """
+    Periodically sample the call stack of a thread and count identical
+    stacks in folded format, which flame graph tools take as input.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self.stacks = Counter()
+
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def operator_table(profile, top_n: int):
+    """
+    Return top_n Modin API functions of a profile by cumulative time, so
+    that e.g. time of groupby.agg can be compared with dataframe.merge.
+    Time the driver spends waiting for engine workers is attributed to the
+    operator that waits.
+    """
+    api_dir = os.sep + os.path.join("modin", "pandas") + os.sep
+    rows = []
+    for (filename, _, funcname), (_, ncalls, _, cumtime, _) in pstats.Stats(
+        profile
+    ).stats.items():
+        if api_dir in filename and not funcname.startswith("_"):
+            module = os.path.splitext(os.path.basename(filename))[0]
+            rows.append((cumtime, ncalls, f"{module}.{funcname}"))
+    rows.sort(reverse=True)
+    return rows[:top_n]
+
+
+class PhaseProfiler:
+    """
+    Phase observer that profiles outermost benchmark phases with cProfile and
+    a stack sampler. For each phase it writes cProfile statistics (.prof),
+    sampled stacks in folded format (.folded) and a table of top Modin
+    operators (.txt) to output_dir.
+    """
+
+    def __init__(self, output_dir: str, top_n: int = 20, interval: float = 0.005):
+        self._output_dir = output_dir
+        self._top_n = top_n
+        self._interval = interval
+        self._prefix = ""
+        self._active = False
+        self._names = Counter()
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def set_prefix(self, prefix: str):
+        self._prefix = prefix
+
+    def _unique_name(self, phase: str):
+        # The same phase function may run several times, e.g. Q3 and Q4
+        # both run on copies, so repeated names get a counter.
+        name = f"{self._prefix}_{phase}" if self._prefix else phase
+        self._names[name] += 1
+        count = self._names[name]
+        return name if count == 1 else f"{name}_{count}"
+
+    @contextmanager
+    def __call__(self, phase: str):
+        # Only one cProfile profiler can be active at a time, phases nested
+        # in it or running concurrently in other threads are covered by the
+        # profile of the outermost one.
+        with self._lock:
+            if self._active:
+                outermost = False
+            else:
+                outermost = self._active = True
+                name = self._unique_name(phase)
+        if not outermost:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), self._interval)
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            sampler.stop()
+            self._write(name, profile, sampler)
+            with self._lock:
+                self._active = False
+
+    def _write(self, name: str, profile, sampler: StackSampler):
+        path = os.path.join(self._output_dir, name)
+        profile.dump_stats(path + ".prof")
+        with open(path + ".folded", "w") as fp:
+            for stack, count in sampler.stacks.most_common():
+                fp.write(f"{stack} {count}\n")
+        with open(path + ".txt", "w") as fp:
+            fp.write(f"{'cumulative, s':>14} {'calls':>8}  operator\n")
+            for cumtime, ncalls, operator in operator_table(profile, self._top_n):
+                fp.write(f"{cumtime:14.3f} {ncalls:8d}  {operator}\n")
+
+    def write_engine_timeline(self):
+        """Dump per-task timeline of Ray workers in Chrome trace format."""
+        try:
+            import ray
+        except ImportError:
+            return
+        if ray.is_initialized():
+            ray.timeline(
+                filename=os.path.join(self._output_dir, f"{self._prefix}_ray_timeline.json")
+            )
@@ -0,0 +1,103 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import numpy as np
+
+
+class RidgeStatistics:
+    """
+    Sufficient statistics of ridge regression over rows of X and y: number
+    of rows, means and centered sums of products. Statistics of parts of
+    the data are merged with the pairwise update of Chan et al., which stays
+    accurate for columns with large values, unlike raw sums of products.
+    """
+
+    __slots__ = ("n", "mean_x", "mean_y", "sxx", "sxy", "syy")
+
+    def __init__(self, n, mean_x, mean_y, sxx, sxy, syy):
+        self.n = n
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.sxx = sxx
+        self.sxy = sxy
+        self.syy = syy
+
+    @classmethod
+    def empty(cls, features: int):
+        return cls(0, np.zeros(features), 0.0, np.zeros((features, features)), np.zeros(features), 0.0)
+
+    @classmethod
+    def from_arrays(cls, X, y):
+        if len(y) == 0:
+            return cls.empty(X.shape[1])
+        mean_x = X.mean(axis=0)
+        mean_y = y.mean()
+        xc = X - mean_x
+        yc = y - mean_y
+        return cls(len(y), mean_x, mean_y, xc.T @ xc, xc.T @ yc, yc @ yc)
+
+    def merge(self, other):
+        """Statistics of rows of both self and other."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        w = self.n * other.n / n
+        return RidgeStatistics(
+            n,
+            self.mean_x + dx * (other.n / n),
+            self.mean_y + dy * (other.n / n),
+            self.sxx + other.sxx + w * np.outer(dx, dx),
+            self.sxy + other.sxy + w * dx * dy,
+            self.syy + other.syy + w * dy * dy,
+        )
+
+    def subtract(self, part):
+        """Statistics of rows of self that are not in part, a subset of them."""
+        if part.n == 0:
+            return self
+        n = self.n - part.n
+        mean_x = (self.mean_x * self.n - part.mean_x * part.n) / n
+        mean_y = (self.mean_y * self.n - part.mean_y * part.n) / n
+        dx = part.mean_x - mean_x
+        dy = part.mean_y - mean_y
+        w = n * part.n / self.n
+        return RidgeStatistics(
+            n,
+            mean_x,
+            mean_y,
+            self.sxx - part.sxx - w * np.outer(dx, dx),
+            self.sxy - part.sxy - w * dx * dy,
+            self.syy - part.syy - w * dy * dy,
+        )
+
+    def solve(self, alpha: float = 1.0):
+        """
+        Return coefficients and intercept of ridge regression with intercept,
+        the same as sklearn Ridge fitted over the rows.
+        """
+        coef = np.linalg.solve(self.sxx + alpha * np.eye(len(self.sxy)), self.sxy)
+        return coef, self.mean_y - self.mean_x @ coef
+
+    def squared_error(self, coef, intercept):
+        """Sum of squared residuals of a linear model over the rows."""
+        bias = self.mean_y - self.mean_x @ coef - intercept
+        return (
+            self.syy
+            - 2 * coef @ self.sxy
+            + coef @ self.sxx @ coef
+            + self.n * bias * bias
+        )
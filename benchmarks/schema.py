@@ -0,0 +1,101 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import json
+import numpy as np
+import pandas
+
+_int_types = ["int8", "int16", "int32", "int64"]
+
+
+def load_schema(data_file):
+    """
+    Load field declarations the generator stored next to data_file. Every
+    field maps to a list of its type name followed by type parameters, for
+    "categorical" fields they are the dictionary values. Returns an empty
+    dict for files without a schema.
+    """
+    schema_file = data_file + ".schema.json"
+    if not os.path.exists(schema_file):
+        return {}
+    with open(schema_file) as fp:
+        return json.load(fp)
+
+
+def categorical_dtypes(dtype, schema):
+    """
+    Return a copy of dtype where "string" columns are loaded as categoricals.
+    Columns with a dictionary recorded by the generator get a fixed set of
+    categories, the rest are left to category inference.
+    """
+    result = dict(dtype)
+    for name, column_type in dtype.items():
+        if column_type != "string":
+            continue
+        declaration = schema.get(name)
+        if declaration is not None and declaration[0] == "categorical":
+            result[name] = pandas.CategoricalDtype(declaration[1:])
+        else:
+            result[name] = "category"
+    return result
+
+
+def merge_schemas(*schemas):
+    """
+    Merge schemas of files that are loaded with the same dtypes. Numeric
+    fields get the union of declared ranges.
+    """
+    result = {}
+    for schema in schemas:
+        for name, declaration in schema.items():
+            known = result.get(name)
+            if known is None or declaration[0] == "categorical":
+                result[name] = list(declaration)
+            else:
+                result[name] = [
+                    known[0],
+                    min(known[1], declaration[1]),
+                    max(known[2], declaration[2]),
+                ]
+    return result
+
+
+def compact_dtypes(dtype, schema):
+    """
+    Return a copy of dtype where integer columns get the narrowest signed
+    integer type that holds the (low, high) range declared in schema.
+    Floating point columns keep their types because narrowing them would
+    change values. Columns without a declaration are not changed.
+    """
+    result = dict(dtype)
+    for name, column_type in dtype.items():
+        declaration = schema.get(name)
+        if (
+            declaration is None
+            or column_type not in _int_types
+            or not declaration[0].startswith("int")
+        ):
+            continue
+        low, high = declaration[1], declaration[2]
+        for int_type in _int_types:
+            info = np.iinfo(int_type)
+            if info.min <= low and high <= info.max:
+                result[name] = int_type
+                break
+    return result
+
+
+def frame_memory(df):
+    """Return memory used by a frame in MB."""
+    return df.memory_usage(deep=True).sum() / 2**20
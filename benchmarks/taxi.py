@@ -12,13 +12,26 @@
 # governing permissions and limitations under the License.
 
 import sys
-import time
 import json
 from collections import OrderedDict
 import modin.pandas as pd
 
+from benchmarks.checkpoint import open_checkpoints, add_saving_time
+from benchmarks.timing import measure
+from benchmarks.tracing import read_span
+from benchmarks.load import run_load as run_clients_load
+from benchmarks.csv_reader import read_csv_chunked, read_throughput, compression_ratio
+from benchmarks.schema import (
+    load_schema,
+    categorical_dtypes,
+    compact_dtypes,
+    frame_memory,
+)
 
-def read(filename):
+PHASES = ("Reading", "Queries")
+
+
+def get_column_types(filename, categorical=False, compact=False):
     column_types = {
         "trip_id": "int64",
         "vendor_id": "string",
@@ -72,7 +85,22 @@ def read(filename):
         "dropoff_ntaname": "string",
         "dropoff_puma": "float64",
     }
+    if categorical:
+        column_types = categorical_dtypes(column_types, load_schema(filename))
+    if compact:
+        column_types = compact_dtypes(column_types, load_schema(filename))
+    return column_types
+
 
+def read(
+    filename,
+    reader="modin",
+    block_size=None,
+    fixed_timestamps=False,
+    categorical=False,
+    compact=False,
+):
+    column_types = get_column_types(filename, categorical, compact)
     all_but_dates = {
         col: valtype
         for (col, valtype) in column_types.items()
@@ -82,19 +110,29 @@ def read(filename):
         col for (col, valtype) in column_types.items() if valtype in ["timestamp"]
     ]
 
-    df = pd.read_csv(
-        filename,
-        header=0,
-        dtype=all_but_dates,
-        parse_dates=dates_only,
-    )
+    if fixed_timestamps and reader != "chunked":
+        raise ValueError("Fixed layout timestamp parser requires chunked reader")
+
+    with read_span(filename) as attrs:
+        if reader == "chunked":
+            df = read_csv_chunked(filename, column_types, block_size, fixed_timestamps)
+        else:
+            df = pd.read_csv(
+                filename,
+                header=0,
+                dtype=all_but_dates,
+                parse_dates=dates_only,
+            )
 
-    df.shape  # to trigger real execution on omnisci
+        attrs["rows"] = len(df)  # to trigger real execution on omnisci
     return df
 
 
 def q1_omnisci(df):
-    q1_pandas_output = df.groupby("cab_type").size()
+    # Groupby over a categorical column works on its integer codes, observed
+    # keeps categories absent from the data out of the result.
+    kwargs = {"observed": True} if df["cab_type"].dtype == "category" else {}
+    q1_pandas_output = df.groupby("cab_type", **kwargs).size()
     q1_pandas_output.shape  # to trigger real execution on omnisci
     return q1_pandas_output
 
@@ -127,6 +165,67 @@ def q4_omnisci(df):
     return q4_pandas_output
 
 
+def q5_omnisci(df):
+    # Number of trips picked up every hour
+    q5_pandas_output = df.set_index("pickup_datetime")["trip_id"].resample("1h").count()
+    q5_pandas_output.shape  # to trigger real execution on omnisci
+    return q5_pandas_output
+
+
+def q6_omnisci(df):
+    # Rolling 7 day mean fare per pickup borough, windows over pickup times
+    # need trips ordered by time within every borough
+    q6_pandas_output = (
+        df[["pickup_borocode", "pickup_datetime", "fare_amount"]]
+        .assign(pickup_borocode=df["pickup_borocode"].fillna(0).astype("int64"))
+        .sort_values(["pickup_borocode", "pickup_datetime"])
+        .groupby("pickup_borocode")
+        .rolling("7D", on="pickup_datetime")["fare_amount"]
+        .mean()
+    )
+    q6_pandas_output.shape  # to trigger real execution on omnisci
+    return q6_pandas_output
+
+
+def q7_omnisci(df):
+    # Percentiles of trip durations in seconds
+    duration = (df["dropoff_datetime"] - df["pickup_datetime"]).dt.total_seconds()
+    q7_pandas_output = duration.quantile([0.5, 0.9, 0.95, 0.99])
+    q7_pandas_output.shape  # to trigger real execution on omnisci
+    return q7_pandas_output
+
+
+# Resample, window and duration queries expect trips ordered by pickup
+# time with dropoffs after pickups, so they only run over such datasets
+TIME_ORDERED_QUERIES = (("Q5", q5_omnisci), ("Q6", q6_omnisci), ("Q7", q7_omnisci))
+
+
+def run_queries(df, res, time_ordered=False):
+    _, res["Q1"] = measure(q1_omnisci, df)
+    _, res["Q2"] = measure(q2_omnisci, df)
+    _, res["Q3"] = measure(q3_omnisci, df.copy())
+    _, res["Q4"] = measure(q4_omnisci, df.copy())
+    if time_ordered:
+        for name, query in TIME_ORDERED_QUERIES:
+            _, res[name] = measure(query, df)
+    return res
+
+
+def load_queries(df, time_ordered=False):
+    # Q3 and Q4 modify their input, so every run gets its own copy
+    queries = [
+        ("Q1", lambda: q1_omnisci(df)),
+        ("Q2", lambda: q2_omnisci(df)),
+        ("Q3", lambda: q3_omnisci(df.copy())),
+        ("Q4", lambda: q4_omnisci(df.copy())),
+    ]
+    if time_ordered:
+        queries += [
+            (name, lambda query=query: query(df)) for name, query in TIME_ORDERED_QUERIES
+        ]
+    return queries
+
+
 def hdk_warmap_query():
     # Trigger HDK initialization by executing a quick trivial
     # query. It is necessary for correct time measurement of ETL part.
@@ -135,22 +234,89 @@ def hdk_warmap_query():
     df.shape
 
 
-def measure(func, *args, **kw):
-    t0 = time.time()
-    res = func(*args, **kw)
-    t1 = time.time()
-    return res, t1 - t0
+def run(
+    input_file,
+    checkpoint_dir=None,
+    from_phase="Reading",
+    reader="modin",
+    block_size=None,
+    fixed_timestamps=False,
+    categorical=False,
+    compact=False,
+    report_memory=False,
+    time_ordered=False,
+):
+    """
+    Run Taxi benchmark over input_file, which is either a data file name or
+    a frame generated in memory. In the latter case there is no Reading
+    phase and checkpoints are not used. Queries Q5-Q7 run only when trips
+    are time_ordered.
+    """
+    in_memory = isinstance(input_file, pd.DataFrame)
+    if in_memory:
+        start, checkpoints = 0, None
+    else:
+        start, checkpoints = open_checkpoints(
+            "taxi", PHASES, from_phase, checkpoint_dir, input_file
+        )
 
+    res = OrderedDict()
+    # In a fresh process the trivial query initializes the engine
+    _, res["Engine init"] = measure(hdk_warmap_query)
+    if in_memory:
+        df = input_file
+    elif start == 0:
+        df, res["Reading"] = measure(
+            read,
+            input_file,
+            reader,
+            block_size,
+            fixed_timestamps,
+            categorical,
+            compact,
+        )
+        if reader == "chunked":
+            res["Reading throughput, MB/s"] = read_throughput(
+                [input_file], res["Reading"]
+            )
+            ratio = compression_ratio([input_file])
+            if ratio is not None:
+                res["Compression ratio"] = ratio
+        if checkpoints is not None:
+            checkpoints.save("Reading", df=df)
+    else:
+        (df,) = checkpoints.load("Reading", "df")
+    if report_memory:
+        res["Frame memory, MB"] = frame_memory(df)
+    run_queries(df, res, time_ordered)
+    add_saving_time(res, checkpoints)
+    return res
 
-def run(input_file):
+
+def run_load(
+    input_file,
+    clients_list,
+    duration,
+    reader="modin",
+    block_size=None,
+    fixed_timestamps=False,
+    categorical=False,
+    compact=False,
+    time_ordered=False,
+):
     hdk_warmap_query()
 
     res = OrderedDict()
-    df, res["Reading"] = measure(read, input_file)
-    _, res["Q1"] = measure(q1_omnisci, df)
-    _, res["Q2"] = measure(q2_omnisci, df)
-    _, res["Q3"] = measure(q3_omnisci, df.copy())
-    _, res["Q4"] = measure(q4_omnisci, df.copy())
+    df, res["Reading"] = measure(
+        read,
+        input_file,
+        reader,
+        block_size,
+        fixed_timestamps,
+        categorical,
+        compact,
+    )
+    res.update(run_clients_load(load_queries(df, time_ordered), clients_list, duration))
     return res
 
 
@@ -0,0 +1,37 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import time
+from contextlib import ExitStack
+
+# Callables that take a phase name and return a context manager wrapping
+# execution of the phase, e.g. profilers.
+_phase_observers = []
+
+
+def add_phase_observer(observer):
+    _phase_observers.append(observer)
+
+
+def remove_phase_observer(observer):
+    _phase_observers.remove(observer)
+
+
+def measure(func, *args, **kw):
+    with ExitStack() as stack:
+        for observer in _phase_observers:
+            stack.enter_context(observer(func.__name__))
+        t0 = time.time()
+        res = func(*args, **kw)
+        t1 = time.time()
+    return res, t1 - t0
@@ -0,0 +1,180 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+# Tracer that records spans of the current process, spans are not recorded
+# until tracing is started.
+_tracer = None
+
+
+class Span:
+    __slots__ = ("name", "category", "benchmark", "start", "end", "pid", "tid", "attrs")
+
+    def __init__(self, name: str, category: str, benchmark: str, attrs: dict):
+        self.name = name
+        self.category = category
+        self.benchmark = benchmark
+        self.start = time.time()
+        self.end = None
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.attrs = attrs
+
+
+class Tracer:
+    """
+    Recorder of nested spans of benchmark execution. Spans are opened with
+    span(), the tracer itself is a phase observer that opens a span for
+    every measured phase. Times are wall clock, so traces of different
+    processes can be put on one timeline.
+    """
+
+    def __init__(self):
+        self._spans = []
+        self._lock = threading.Lock()
+        self._benchmark = ""
+
+    def set_benchmark(self, benchmark: str):
+        self._benchmark = benchmark
+
+    @contextmanager
+    def span(self, name: str, category: str = "step", **attrs):
+        span = Span(name, category, self._benchmark, attrs)
+        try:
+            yield span.attrs
+        finally:
+            span.end = time.time()
+            with self._lock:
+                self._spans.append(span)
+
+    def __call__(self, phase: str):
+        return self.span(phase, "phase")
+
+    def chrome_trace_events(self):
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "args": {"name": "launcher"},
+            }
+        ]
+        for span in sorted(self._spans, key=lambda s: s.start):
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": (span.end - span.start) * 1e6,
+                    "pid": span.pid,
+                    "tid": span.tid,
+                    "args": dict(span.attrs, benchmark=span.benchmark),
+                }
+            )
+        return events
+
+    def write_chrome_trace(self, filename: str):
+        """
+        Write spans in Chrome trace format, which can be opened in
+        chrome://tracing or Perfetto. When Modin runs on Ray, tasks of Ray
+        workers are added to the same timeline.
+        """
+        events = self.chrome_trace_events()
+        try:
+            import ray
+        except ImportError:
+            ray = None
+        if ray is not None and ray.is_initialized():
+            events.extend(ray.timeline())
+        with open(filename, "w") as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+
+    def write_openmetrics(self, filename: str):
+        """
+        Write totals of spans in OpenMetrics text format. Spans with the same
+        benchmark and name are summed, e.g. reads of several files.
+        """
+        totals = OrderedDict()
+        for span in self._spans:
+            key = (span.benchmark, span.name, span.category)
+            seconds, count, rows, nbytes = totals.get(key, (0.0, 0, 0, 0))
+            totals[key] = (
+                seconds + span.end - span.start,
+                count + 1,
+                rows + span.attrs.get("rows", 0),
+                nbytes + span.attrs.get("bytes", 0),
+            )
+
+        lines = [
+            "# TYPE benchmark_span_seconds summary",
+            "# UNIT benchmark_span_seconds seconds",
+            "# HELP benchmark_span_seconds Wall time of benchmark spans.",
+        ]
+        for key, (seconds, count, _, _) in totals.items():
+            lines.append(f"benchmark_span_seconds_sum{{{_labels(*key)}}} {seconds}")
+            lines.append(f"benchmark_span_seconds_count{{{_labels(*key)}}} {count}")
+        for metric, index, help_text in (
+            ("benchmark_span_rows", 2, "Rows processed by benchmark spans."),
+            ("benchmark_span_bytes", 3, "Bytes processed by benchmark spans."),
+        ):
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"# HELP {metric} {help_text}")
+            for key, values in totals.items():
+                if values[index]:
+                    lines.append(f"{metric}_total{{{_labels(*key)}}} {values[index]}")
+        lines.append("# EOF")
+        with open(filename, "w") as fp:
+            fp.write("\n".join(lines) + "\n")
+
+
+def _labels(benchmark: str, name: str, category: str):
+    def escape(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return (
+        f'benchmark="{escape(benchmark)}",'
+        f'span="{escape(name)}",'
+        f'category="{escape(category)}"'
+    )
+
+
+def start_tracing():
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def span(name: str, category: str = "step", **attrs):
+    """
+    Context manager recording a span when tracing is started. It yields a
+    dict of span attributes, so that counters known only at the end, like
+    "rows" and "bytes", can be added inside the block.
+    """
+    if _tracer is None:
+        return nullcontext(attrs)
+    return _tracer.span(name, category, **attrs)
+
+
+def read_span(filename: str):
+    """Span of reading a data file, callers add "rows" once the frame is read."""
+    return span(
+        f"Read {os.path.basename(filename)}", "read", bytes=os.path.getsize(filename)
+    )
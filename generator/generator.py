@@ -15,6 +15,7 @@ import argparse
 import abc
 
 import os
+import json
 import numpy as np
 try:
     import modin.pandas as pd
@@ -22,15 +23,56 @@ except ImportError:
     import pandas as pd
 from numpy.random import default_rng, SeedSequence
 
+try:
+    from generator.compression import COMPRESSION_EXTENSIONS, frames_file_name
+except ImportError:
+    # Generator is run as a standalone script from its directory
+    from compression import COMPRESSION_EXTENSIONS, frames_file_name
+
+try:
+    from benchmarks.tracing import span
+except ImportError:
+    # Generator is run as a standalone script
+    from contextlib import nullcontext
+
+    def span(name, category="step", **attrs):
+        return nullcontext(attrs)
+
 seed = 42
+# Estimate of memory needed to generate and write one value, including the
+# frame built from generated columns and its CSV text
+_BYTES_PER_VALUE = 64
+# Uncompressed size of independently decodable frames of compressed files
+DEFAULT_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def schema_file_name(output_file_name: str):
+    return output_file_name + ".schema.json"
+
+
+def shard_file_name(output_file_name: str, shard: int):
+    root, ext = os.path.splitext(output_file_name)
+    return f"{root}.shard{shard:03d}{ext}"
 
 
 class DatasetGenerator(abc.ABC):
-    def __init__(self, output_file_name: str, reuse: bool, parallel: bool, num_cpus: int):
+    def __init__(
+        self,
+        output_file_name: str,
+        reuse: bool,
+        parallel: bool,
+        num_cpus: int,
+        memory_budget: int = None,
+        compression: str = None,
+        frame_size: int = None,
+    ):
         self._output_file_name = output_file_name
         self._reuse = reuse
         self._parallel = parallel
         self._num_cpus = num_cpus
+        self._memory_budget = memory_budget
+        self._compression = compression
+        self._frame_size = frame_size if frame_size is not None else DEFAULT_FRAME_SIZE
 
     @abc.abstractmethod
     def generate_check_args(self, **kwargs):
@@ -77,9 +119,30 @@ class DatasetGenerator(abc.ABC):
             cls._generators[type_name](rnd, records, series_params), name=name
         )
 
-    def _generate_data(self, fields: dict, records_number: int):
-        generators = SeedSequence(seed).spawn(len(fields))
-        map_args = [
+    def _chunk_records(self, fields: dict):
+        """Number of records generated at once to stay within memory budget."""
+        if self._memory_budget is None:
+            return None
+        return max(self._memory_budget // (len(fields) * _BYTES_PER_VALUE), 1)
+
+    def _generate_data(
+        self, fields: dict, records_number: int, shard: int = None, chunk: int = None
+    ):
+        with span("Generate columns", "generation", rows=records_number):
+            return self._generate_columns(fields, records_number, shard, chunk)
+
+    def _column_args(
+        self, fields: dict, records_number: int, shard: int = None, chunk: int = None
+    ):
+        # Every shard and every chunk gets its own independent random streams
+        if chunk is not None:
+            seed_sequence = SeedSequence(seed, spawn_key=(shard or 0, chunk))
+        elif shard is not None:
+            seed_sequence = SeedSequence(seed, spawn_key=(shard,))
+        else:
+            seed_sequence = SeedSequence(seed)
+        generators = seed_sequence.spawn(len(fields))
+        return [
             (
                 default_rng(generators[i]),
                 column[0],
@@ -90,16 +153,25 @@ class DatasetGenerator(abc.ABC):
             for i, column in enumerate(fields.items())
         ]
 
-        if self._parallel:
-            import ray
+    def _init_ray(self):
+        import ray
+
+        if not ray.is_initialized():
+            ray_ver = [int(x) for x in ray.__version__.split(".")]
+            if ray_ver[0] < 1 or ray_ver[0] == 1 and ray_ver[1] <= 6:
+                # Workaround for ray-1.6.0 problem with runtime_env parameter
+                ray.init(num_cpus=self._num_cpus)
+            else:
+                ray.init(num_cpus=self._num_cpus, runtime_env={"env_vars": {"__MODIN_AUTOIMPORT_PANDAS__": "1"}})
+        return ray
+
+    def _generate_columns(
+        self, fields: dict, records_number: int, shard: int = None, chunk: int = None
+    ):
+        map_args = self._column_args(fields, records_number, shard, chunk)
 
-            if not ray.is_initialized():
-                ray_ver = [int(x) for x in ray.__version__.split(".")]
-                if ray_ver[0] < 1 or ray_ver[0] == 1 and ray_ver[1] <= 6:
-                    # Workaround for ray-1.6.0 problem with runtime_env parameter
-                    ray.init(num_cpus=self._num_cpus)
-                else:
-                    ray.init(num_cpus=self._num_cpus, runtime_env={"env_vars": {"__MODIN_AUTOIMPORT_PANDAS__": "1"}})
+        if self._parallel:
+            ray = self._init_ray()
 
             @ray.remote
             def remote_map(f, obj):
@@ -116,12 +188,151 @@ class DatasetGenerator(abc.ABC):
 
         return data
 
+    def _partitions_number(self):
+        return self._num_cpus if self._num_cpus is not None else os.cpu_count()
+
+    def _generate_frame(self, fields: dict, partitions: list, dtype: dict = None):
+        """
+        Generate a Modin frame whose row partitions are generated by Ray
+        tasks straight in the object store, without writing a file.
+        partitions is a list of (records, ids) pairs, ids are values of
+        "object_id" column prepended to a partition or None. Generated
+        columns are cast to dtype, so the frame matches a frame read from
+        a data file with the same dtype.
+        """
+        import pandas
+        from modin.distributed.dataframe.pandas import from_partitions
+
+        ray = self._init_ray()
+        remote_partition = ray.remote(num_returns=2)(generate_partition)
+
+        parts, lengths = [], []
+        for chunk, (records, ids) in enumerate(partitions):
+            part, length = remote_partition.remote(
+                self._column_args(fields, records, chunk=chunk), dtype, ids
+            )
+            parts.append(part)
+            lengths.append(length)
+        lengths = ray.get(lengths)
+
+        columns = list(fields.keys())
+        if partitions[0][1] is not None:
+            columns.insert(0, "object_id")
+        return from_partitions(
+            parts,
+            axis=0,
+            index=pandas.RangeIndex(sum(lengths)),
+            columns=pandas.Index(columns),
+            row_lengths=lengths,
+            column_widths=[len(columns)],
+        )
+
+    def _split_records(self, records_number: int):
+        num_parts = min(self._partitions_number(), max(records_number, 1))
+        return [
+            (records_number // num_parts + (1 if i < records_number % num_parts else 0), None)
+            for i in range(num_parts)
+        ]
+
+    @staticmethod
+    def _write_schema(fields: dict, output_file_name: str):
+        # Field declarations are stored next to the data file, so that readers
+        # know dictionaries of categorical fields and value ranges of the rest.
+        schema = {name: list(params) for name, params in fields.items()}
+        with open(schema_file_name(output_file_name), "w") as fp:
+            json.dump(schema, fp, indent=4, default=str)
+
+    def _data_file_name(self, output_file_name: str):
+        """Name of the data file that is left after output is written."""
+        if self._compression is None:
+            return output_file_name
+        return output_file_name + COMPRESSION_EXTENSIONS[self._compression]
+
+    def _compress_file(self, output_file_name: str):
+        """
+        Compress a CSV file as a sequence of independently decodable frames
+        of whole lines, so that readers can decompress them in parallel.
+        Concatenated frames are also a valid compressed stream for standard
+        tools. Offsets and sizes of frames are written to a sidecar file and
+        the uncompressed file is removed.
+        """
+        import pyarrow as pa
+
+        compressed_file_name = self._data_file_name(output_file_name)
+        print("Compressing output to", compressed_file_name)
+        frames = []
+        offset = 0
+        with span(
+            f"Compress {os.path.basename(output_file_name)}", "generation"
+        ) as attrs, open(output_file_name, "rb") as src, open(
+            compressed_file_name, "wb"
+        ) as dst:
+            header = src.readline()
+            src.seek(0)
+            while True:
+                block = src.read(self._frame_size)
+                if not block:
+                    break
+                block += src.readline()  # frames end at line boundaries
+                frame = pa.compress(block, codec=self._compression, asbytes=True)
+                dst.write(frame)
+                frames.append([offset, len(frame), len(block)])
+                offset += len(frame)
+            attrs["bytes"] = src.tell()
+        with open(frames_file_name(compressed_file_name), "w") as fp:
+            json.dump(
+                {
+                    "codec": self._compression,
+                    "header_size": len(header),
+                    "frames": frames,
+                },
+                fp,
+            )
+        os.remove(output_file_name)
+        return compressed_file_name
+
+    def _finish_file(self, fields: dict, output_file_name: str):
+        if self._compression is not None:
+            output_file_name = self._compress_file(output_file_name)
+        self._write_schema(fields, output_file_name)
+
+    @staticmethod
+    def _write_csv(df, output_file_name: str, append: bool = False):
+        if not append:
+            print("Writing output to", output_file_name)
+        size = os.path.getsize(output_file_name) if append else 0
+        with span(
+            f"Write {os.path.basename(output_file_name)}", "generation", rows=len(df)
+        ) as attrs:
+            df.to_csv(
+                output_file_name, index=False, mode="a" if append else "w", header=not append
+            )
+            attrs["bytes"] = os.path.getsize(output_file_name) - size
+
     def _generate_and_write_data(
-        self, fields: dict, output_file_name: str, records_number: int
+        self, fields: dict, output_file_name: str, records_number: int, shard: int = None
     ):
-        data = self._generate_data(fields, records_number)
-        print("Writing output to", output_file_name)
-        pd.DataFrame(data).to_csv(output_file_name, index=False)
+        chunk_records = self._chunk_records(fields)
+        if chunk_records is None or records_number <= chunk_records:
+            data = self._generate_data(fields, records_number, shard)
+            data = self._arrange(data, shard, None, 0, records_number)
+            self._write_csv(pd.DataFrame(data), output_file_name)
+        else:
+            # Generate and append the file in chunks that fit into memory budget
+            for chunk, start in enumerate(range(0, records_number, chunk_records)):
+                records = min(chunk_records, records_number - start)
+                data = self._generate_data(fields, records, shard, chunk)
+                data = self._arrange(data, shard, chunk, start, records_number)
+                self._write_csv(pd.DataFrame(data), output_file_name, append=chunk > 0)
+        self._finish_file(fields, output_file_name)
+
+    def _arrange(self, data: dict, shard: int, chunk: int, start: int, records_number: int):
+        """
+        Rearrange generated columns of records from start to start + chunk
+        size of records_number records before they are written. Columns are
+        independent by default and are written as generated.
+        """
+        return data
 
     @staticmethod
     def _split_range_into_random_parts(range_max, num_parts, min_size, max_size):
@@ -144,8 +355,55 @@ class DatasetGenerator(abc.ABC):
 
         return parts
 
+    @staticmethod
+    def _split_parts_into_chunks(parts, chunk_records):
+        """
+        Group consecutive parts into chunks of at most chunk_records records,
+        a chunk always has at least one part. Returns (first, last) part ranges.
+        """
+        if chunk_records is None:
+            return [(0, len(parts))]
+        chunks = []
+        first = 0
+        while first < len(parts):
+            last = first + 1
+            records = parts[first]
+            while last < len(parts) and records + parts[last] <= chunk_records:
+                records += parts[last]
+                last += 1
+            chunks.append((first, last))
+            first = last
+        return chunks
+
+
+def generate_partition(map_args: list, dtype: dict = None, ids=None):
+    import pandas
+
+    df = pandas.DataFrame(
+        {
+            name: DatasetGenerator._generators[type_name](rnd, records, series_params)
+            for rnd, name, type_name, records, series_params in map_args
+        }
+    )
+    if ids is not None:
+        df.insert(0, column="object_id", value=ids)
+    if dtype is not None:
+        df = df.astype(
+            {k: v for k, v in dtype.items() if k in df.columns and v != "timestamp"}
+        )
+    return df, len(df)
+
 
 class TaxiGenerator(DatasetGenerator):
+    # Mean duration of time ordered trips in seconds, durations are
+    # exponentially distributed and at least a minute long
+    _mean_trip_duration = 900
+    _min_trip_duration = 60
+
+    def __init__(self, *args, time_ordered: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._time_ordered = time_ordered
+
     _fields = {
         "trip_id": ("int64", 1, 1464785771),
         #        "vendor_id": ("object", nan, nan),
@@ -216,10 +474,42 @@ class TaxiGenerator(DatasetGenerator):
         print("Generating taxi")
         self.generate(records)
 
+    def _arrange(self, data: dict, shard: int, chunk: int, start: int, records_number: int):
+        # Time ordered trips of a chunk are picked up within its share of the
+        # time range, so chunks follow each other, and are dropped off after
+        # a random duration.
+        if not self._time_ordered:
+            return data
+        records = len(data["pickup_datetime"])
+        low, high = self._fields["pickup_datetime"][1:]
+        seconds = (high - low) / np.timedelta64(1, "s")
+        first = low + np.timedelta64(int(seconds * start / records_number), "s")
+        last = low + np.timedelta64(int(seconds * (start + records) / records_number), "s")
+        rnd = default_rng(SeedSequence(seed + 1, spawn_key=(shard or 0, chunk or 0)))
+        pickup = np.sort(self._generate_datetime(rnd, records, (first, last)))
+        duration = rnd.exponential(self._mean_trip_duration - self._min_trip_duration, records)
+        duration = (duration + self._min_trip_duration).astype(np.int64).astype("timedelta64[s]")
+        data["pickup_datetime"] = pd.Series(pickup, name="pickup_datetime")
+        data["dropoff_datetime"] = pd.Series(pickup + duration, name="dropoff_datetime")
+        return data
+
     def generate(self, records: int):
         if not self._reuse:
             self._generate_and_write_data(self._fields, self._output_file_name, records)
-        return self._output_file_name
+        return self._data_file_name(self._output_file_name)
+
+    def generate_shard(self, records: int, shard: int):
+        output_file_name = shard_file_name(self._output_file_name, shard)
+        if not self._reuse:
+            self._generate_and_write_data(self._fields, output_file_name, records, shard)
+        return self._data_file_name(output_file_name)
+
+    def write_schema(self):
+        """Write schema of the dataset without generating data."""
+        self._write_schema(self._fields, self._data_file_name(self._output_file_name))
+
+    def generate_frame(self, records: int, dtype: dict = None):
+        return self._generate_frame(self._fields, self._split_records(records), dtype)
 
 
 class CensusGenerator(DatasetGenerator):
@@ -282,7 +572,20 @@ class CensusGenerator(DatasetGenerator):
     def generate(self, records: int):
         if not self._reuse:
             self._generate_and_write_data(self._fields, self._output_file_name, records)
-        return self._output_file_name
+        return self._data_file_name(self._output_file_name)
+
+    def generate_shard(self, records: int, shard: int):
+        output_file_name = shard_file_name(self._output_file_name, shard)
+        if not self._reuse:
+            self._generate_and_write_data(self._fields, output_file_name, records, shard)
+        return self._data_file_name(output_file_name)
+
+    def write_schema(self):
+        """Write schema of the dataset without generating data."""
+        self._write_schema(self._fields, self._data_file_name(self._output_file_name))
+
+    def generate_frame(self, records: int, dtype: dict = None):
+        return self._generate_frame(self._fields, self._split_records(records), dtype)
 
 
 class PlasticcGenerator(DatasetGenerator):
@@ -348,6 +651,19 @@ class PlasticcGenerator(DatasetGenerator):
     _test_set_object_ids = (13, 130788054)
     _test_set_objects_numbers = (45, 352)
 
+    def _generate_metadata(self, fields: dict, records: int):
+        """
+        Generate metadata with one row per object. Object ids are unique and
+        ascending like in PLAsTiCC, so rows of every object form a single
+        run in data files.
+        """
+        metadata = pd.DataFrame(self._generate_data(fields, records))
+        low, high = fields["object_id"][1:]
+        rnd = default_rng(SeedSequence(seed).spawn(len(fields))[list(fields).index("object_id")])
+        ids = np.sort(rnd.choice(high - low + 1, size=records, replace=False)) + low
+        metadata["object_id"] = ids.astype(np.int32)
+        return metadata
+
     def generate_check_args(self, **kwargs):
         training_set_records = kwargs.pop("training_set_records", None)
         assert (
@@ -382,12 +698,12 @@ class PlasticcGenerator(DatasetGenerator):
         training_set_metadata_records: int,
         test_set_metadata_records: int,
     ):
-        training_set_file = self._output_file_name + "_training_set.csv"
-        test_set_file = self._output_file_name + "_test_set.csv"
-        training_set_metadata_file = (
-            self._output_file_name + "_training_set_metadata.csv"
-        )
-        test_set_metadata_file = self._output_file_name + "_test_set_metadata.csv"
+        (
+            training_set_file,
+            test_set_file,
+            training_set_metadata_file,
+            test_set_metadata_file,
+        ) = self._file_names()
         if not self._reuse:
 
             def generate_dataset(
@@ -399,21 +715,34 @@ class PlasticcGenerator(DatasetGenerator):
                 data_fields,
                 metadata_fields,
             ):
-                metadata = pd.DataFrame(
-                    self._generate_data(metadata_fields, metadata_records)
-                )
+                metadata = self._generate_metadata(metadata_fields, metadata_records)
                 numbers = self._split_range_into_random_parts(
                     data_records, metadata_records, object_numbers[0], object_numbers[1]
                 )
-                data_records = sum(numbers)
-                data = pd.DataFrame(self._generate_data(data_fields, data_records))
-                ids = np.concatenate([np.repeat(np.array([x]), n) for (x, n) in zip(metadata["object_id"], numbers)])
-                data.insert(0, column="object_id", value=ids)
+                # Rows of an object are never split between chunks
+                chunks = self._split_parts_into_chunks(
+                    numbers, self._chunk_records(data_fields)
+                )
+                object_ids = metadata["object_id"].to_numpy()
+                for chunk, (first, last) in enumerate(chunks):
+                    data_records = sum(numbers[first:last])
+                    data = pd.DataFrame(
+                        self._generate_data(
+                            data_fields,
+                            data_records,
+                            chunk=chunk if len(chunks) > 1 else None,
+                        )
+                    )
+                    ids = np.repeat(object_ids[first:last], numbers[first:last])
+                    data.insert(0, column="object_id", value=ids)
+                    self._write_csv(data, data_output, append=chunk > 0)
 
-                print("Writing output to", data_output)
-                data.to_csv(data_output, index=False)
-                print("Writing output to", metadata_output)
-                metadata.to_csv(metadata_output, index=False)
+                self._write_csv(metadata, metadata_output)
+                self._finish_file(
+                    {"object_id": metadata_fields["object_id"], **data_fields},
+                    data_output,
+                )
+                self._finish_file(metadata_fields, metadata_output)
 
             generate_dataset(
                 training_set_records,
@@ -434,19 +763,304 @@ class PlasticcGenerator(DatasetGenerator):
                 self._test_set_metadata_fields,
             )
 
+        return self.data_file_names()
+
+    def data_file_names(self):
+        return tuple(self._data_file_name(f) for f in self._file_names())
+
+    def _file_names(self):
         return (
+            self._output_file_name + "_training_set.csv",
+            self._output_file_name + "_test_set.csv",
+            self._output_file_name + "_training_set_metadata.csv",
+            self._output_file_name + "_test_set_metadata.csv",
+        )
+
+    def write_schema(self):
+        """Write schemas of the dataset files without generating data."""
+        (
             training_set_file,
             test_set_file,
             training_set_metadata_file,
             test_set_metadata_file,
+        ) = self.data_file_names()
+        for data_file, metadata_file, data_fields, metadata_fields in (
+            (
+                training_set_file,
+                training_set_metadata_file,
+                self._training_set_fields,
+                self._training_set_metadata_fields,
+            ),
+            (
+                test_set_file,
+                test_set_metadata_file,
+                self._test_set_fields,
+                self._test_set_metadata_fields,
+            ),
+        ):
+            self._write_schema(
+                {"object_id": metadata_fields["object_id"], **data_fields}, data_file
+            )
+            self._write_schema(metadata_fields, metadata_file)
+
+    def generate_frames(
+        self,
+        training_set_records: int,
+        test_set_records: int,
+        training_set_metadata_records: int,
+        test_set_metadata_records: int,
+        dtypes: dict = None,
+        meta_dtypes: dict = None,
+    ):
+        """
+        Generate training set, test set and their metadata as frames in the
+        order of generate() file names. Data partitions are split by whole
+        objects.
+        """
+
+        def generate_dataset(
+            data_records,
+            metadata_records,
+            object_numbers,
+            data_fields,
+            metadata_fields,
+        ):
+            metadata = self._generate_metadata(metadata_fields, metadata_records)
+            if meta_dtypes is not None:
+                metadata = metadata.astype(
+                    {k: v for k, v in meta_dtypes.items() if k in metadata.columns}
+                )
+            numbers = self._split_range_into_random_parts(
+                data_records, metadata_records, object_numbers[0], object_numbers[1]
+            )
+            chunks = self._split_parts_into_chunks(
+                numbers, -(-sum(numbers) // self._partitions_number())
+            )
+            object_ids = metadata["object_id"].to_numpy()
+            data = self._generate_frame(
+                data_fields,
+                [
+                    (
+                        sum(numbers[first:last]),
+                        np.repeat(object_ids[first:last], numbers[first:last]),
+                    )
+                    for first, last in chunks
+                ],
+                dtypes,
+            )
+            return data, metadata
+
+        train, train_meta = generate_dataset(
+            training_set_records,
+            training_set_metadata_records,
+            self._training_set_objects_numbers,
+            self._training_set_fields,
+            self._training_set_metadata_fields,
+        )
+        test, test_meta = generate_dataset(
+            test_set_records,
+            test_set_metadata_records,
+            self._test_set_objects_numbers,
+            self._test_set_fields,
+            self._test_set_metadata_fields,
+        )
+        return train, test, train_meta, test_meta
+
+
+class DbbenchGenerator(DatasetGenerator):
+    """
+    Generator of groupby and join datasets modeled on db-benchmark. The
+    groupby table and the left table of joins are main tables, they get
+    nulls and sorted runs, lookup tables of joins have unique keys.
+    """
+
+    # Number of distinct values of low cardinality keys
+    _low_cardinality = 100
+    # Share of key values of the left table of joins found in lookup tables
+    _lookup_share = 0.9
+    _tables = ("groupby", "join_x", "join_small", "join_medium", "join_big")
+
+    def generate_check_args(self, **kwargs):
+        records = kwargs.pop("records", None)
+        assert (
+            records is not None
+        ), 'Parameter "--records" is required for dbbench benchmark'
+        cardinality = kwargs.pop("cardinality", None)
+        assert (
+            cardinality is not None
+        ), 'Parameter "--cardinality" is required for dbbench benchmark'
+        print("Generating dbbench")
+        self.generate(
+            records,
+            int(cardinality),
+            kwargs.pop("null_rate", None) or 0.0,
+            kwargs.pop("sortedness", None) or 0.0,
+        )
+
+    def _table_specs(self, records: int, cardinality: int):
+        """
+        Return (records, fields, unique key, string keys, main) of every
+        table. Fields are generated, the unique key is a (name, high) pair
+        of a column with distinct values from 1 to high, string keys map
+        names of "id..." string columns to integer keys they are formatted
+        from.
+        """
+        low = ("int64", 1, self._low_cardinality)
+        high = ("int64", 1, cardinality)
+        value = ("float64", 0.0, 100.0)
+
+        def lookup_records(keys):
+            return max(round(keys * self._lookup_share), 1)
+
+        return (
+            (
+                records,
+                {
+                    "id1": low,
+                    "id2": low,
+                    "id3": high,
+                    "id4": low,
+                    "id5": low,
+                    "id6": high,
+                    "v1": ("int64", 1, 5),
+                    "v2": ("int64", 1, 15),
+                    "v3": value,
+                },
+                None,
+                {"id1": "id1", "id2": "id2", "id3": "id3"},
+                True,
+            ),
+            (
+                records,
+                {"id1": low, "id2": high, "id3": ("int64", 1, records), "v1": value},
+                None,
+                {"id4": "id1", "id5": "id2", "id6": "id3"},
+                True,
+            ),
+            (
+                lookup_records(self._low_cardinality),
+                {"v2": value},
+                ("id1", self._low_cardinality),
+                {"id4": "id1"},
+                False,
+            ),
+            (
+                lookup_records(cardinality),
+                {"id1": low, "v2": value},
+                ("id2", cardinality),
+                {"id4": "id1", "id5": "id2"},
+                False,
+            ),
+            (
+                lookup_records(records),
+                {"id1": low, "id2": high, "v2": value},
+                ("id3", records),
+                {"id4": "id1", "id5": "id2", "id6": "id3"},
+                False,
+            ),
         )
 
+    @staticmethod
+    def _string_keys(values, high: int):
+        # Keys are zero padded to the same width, so they sort as the integers
+        return np.char.add("id", np.char.zfill(values.astype(str), len(str(high)))).astype(object)
+
+    @staticmethod
+    def _presort(columns: dict, rnd, sortedness: float):
+        """
+        Sort rows by their keys and move the share of 1 - sortedness of them
+        to random positions.
+        """
+        keys = sorted(name for name in columns if name.startswith("id"))
+        order = np.lexsort([columns[name] for name in reversed(keys)])
+        records = len(order)
+        moved = rnd.choice(records, size=round(records * (1 - sortedness)), replace=False)
+        order[moved] = order[rnd.permutation(moved)]
+        return {name: values[order] for name, values in columns.items()}
+
+    def _table_frame(self, columns: dict, spec, rnd, null_rate: float, sortedness: float):
+        import pandas
+
+        records, fields, unique_key, strings, main = spec
+        if main and sortedness > 0:
+            columns = self._presort(columns, rnd, sortedness)
+        highs = dict(fields)
+        if unique_key is not None:
+            highs[unique_key[0]] = ("int64", 1, unique_key[1])
+        for name, source in strings.items():
+            columns[name] = self._string_keys(columns[source], highs[source][2])
+
+        ids = sorted(name for name in columns if name.startswith("id"))
+        values = [name for name in columns if not name.startswith("id")]
+        df = pandas.DataFrame({name: columns[name] for name in ids + values})
+        if main and null_rate > 0:
+            for name in df.columns:
+                nulls = rnd.random(len(df)) < null_rate
+                if df[name].dtype == "int64":
+                    df[name] = df[name].astype("Int64")
+                df.loc[nulls, name] = None
+        return df
+
+    def _generate_table(
+        self, table: int, spec, output_file_name: str, null_rate: float, sortedness: float
+    ):
+        records, fields, unique_key, strings, main = spec
+        schema = dict(fields)
+        keys = None
+        if unique_key is not None:
+            name, high = unique_key
+            schema[name] = ("int64", 1, high)
+            # Streams of keys and row transforms are apart from column streams
+            rnd = default_rng(SeedSequence(seed + 2, spawn_key=(table,)))
+            keys = rnd.permutation(np.arange(1, high + 1))[:records]
+        for name, source in strings.items():
+            schema[name] = ("string",) + tuple(schema[source][1:])
+
+        chunk_records = self._chunk_records(schema) or records
+        starts = range(0, records, chunk_records)
+        for chunk, start in enumerate(starts):
+            chunk_size = min(chunk_records, records - start)
+            data = self._generate_data(
+                fields, chunk_size, table, chunk if len(starts) > 1 else None
+            )
+            columns = {name: np.asarray(values) for name, values in data.items()}
+            if keys is not None:
+                columns[unique_key[0]] = keys[start : start + chunk_size]
+            rnd = default_rng(SeedSequence(seed + 1, spawn_key=(table, chunk)))
+            df = self._table_frame(columns, spec, rnd, null_rate, sortedness)
+            self._write_csv(df, output_file_name, append=chunk > 0)
+        self._finish_file(schema, output_file_name)
+
+    def generate(
+        self, records: int, cardinality: int, null_rate: float = 0.0, sortedness: float = 0.0
+    ):
+        """
+        Generate the groupby table and join tables. cardinality is the
+        number of distinct values of high cardinality keys, null_rate is the
+        share of nulls in every column of main tables and sortedness is the
+        share of their rows that are in key order. With a memory budget main
+        tables are only sorted within chunks.
+        """
+        if not self._reuse:
+            for table, (spec, output_file_name) in enumerate(
+                zip(self._table_specs(records, cardinality), self._file_names())
+            ):
+                self._generate_table(table, spec, output_file_name, null_rate, sortedness)
+        return self.data_file_names()
+
+    def data_file_names(self):
+        return tuple(self._data_file_name(f) for f in self._file_names())
+
+    def _file_names(self):
+        return tuple(f"{self._output_file_name}_{table}.csv" for table in self._tables)
+
 
 def main():
     generators = {
         "taxi": TaxiGenerator,
         "census": CensusGenerator,
         "plasticc": PlasticcGenerator,
+        "dbbench": DbbenchGenerator,
     }
 
     parser = argparse.ArgumentParser(description="Generate dataset for a benchmark.")
@@ -462,7 +1076,25 @@ def main():
         "--records",
         required=False,
         type=int,
-        help="Number of records to generate. Required for census and taxi.",
+        help="Number of records to generate. Required for census, taxi and dbbench.",
+    )
+    parser.add_argument(
+        "--cardinality",
+        required=False,
+        type=float,
+        help="Number of distinct values of high cardinality keys, from 1e2 to 1e8. Required for dbbench.",
+    )
+    parser.add_argument(
+        "--null-rate",
+        required=False,
+        type=float,
+        help="Share of null values in dbbench groupby table and left table of joins. Default is 0.",
+    )
+    parser.add_argument(
+        "--sortedness",
+        required=False,
+        type=float,
+        help="Share of rows of dbbench groupby table and left table of joins that are sorted by keys. Default is 0.",
     )
     parser.add_argument(
         "-trsr",
@@ -496,7 +1128,7 @@ def main():
         "-o",
         "--output",
         required=True,
-        help="File name to write dataset or prefix (in case of plasticc)",
+        help="File name to write dataset or prefix (in case of plasticc and dbbench)",
     )
     parser.add_argument(
         "-np",
@@ -504,8 +1136,61 @@ def main():
         action='store_true',
         help="Disable parallel dataset generation.",
     )
+    parser.add_argument(
+        "--memory-budget",
+        required=False,
+        type=float,
+        help="Generate and write dataset in chunks that fit into this amount of memory in GB.",
+    )
+    parser.add_argument(
+        "-c",
+        "--compression",
+        choices=list(COMPRESSION_EXTENSIONS.keys()),
+        required=False,
+        help="Compress written CSV files as independently decodable frames.",
+    )
+    parser.add_argument(
+        "--frame-size",
+        required=False,
+        type=int,
+        help="Uncompressed size of compressed frames in MB. Default is 64.",
+    )
+    parser.add_argument(
+        "--time-ordered",
+        action='store_true',
+        help="Generate taxi trips ordered by pickup time with dropoff after pickup.",
+    )
+    parser.add_argument(
+        "-s",
+        "--shards",
+        required=False,
+        type=int,
+        help="Split dataset into this number of independently generated shard files. Supported for census and taxi.",
+    )
     args = parser.parse_args()
-    gen = generators[args.mode](args.output, False, not args.no_parallel, os.cpu_count())
+    memory_budget = int(args.memory_budget * 2**30) if args.memory_budget is not None else None
+    frame_size = args.frame_size * 2**20 if args.frame_size is not None else None
+    options = {}
+    if args.time_ordered:
+        assert args.mode == "taxi", "Only taxi trips can be time ordered"
+        options["time_ordered"] = True
+    gen = generators[args.mode](
+        args.output,
+        False,
+        not args.no_parallel,
+        os.cpu_count(),
+        memory_budget,
+        args.compression,
+        frame_size,
+        **options,
+    )
+    if args.shards is not None:
+        assert args.mode in ("taxi", "census"), f"Sharding is not supported for {args.mode}"
+        assert args.records is not None, 'Parameter "--records" is required for sharding'
+        for shard in range(args.shards):
+            records = args.records // args.shards + (1 if shard < args.records % args.shards else 0)
+            gen.generate_shard(records, shard)
+        return
     kwargs = vars(args)
     gen.generate_check_args(**kwargs)
 
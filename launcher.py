@@ -3,6 +3,10 @@ import abc
 import sys
 import json
 import time
+import importlib
+import statistics
+import subprocess
+import tempfile
 from collections import OrderedDict
 
 import os
@@ -10,64 +14,335 @@ import os
 # and this variable has to be set already in case modin experimental API is needed later.
 os.environ["MODIN_EXPERIMENTAL"] = "true"
 
-from generator.generator import TaxiGenerator, CensusGenerator, PlasticcGenerator
-from benchmarks.taxi import run as taxi_run
-from benchmarks.census import run as census_run
-from benchmarks.plasticc import run as plasticc_run
+from benchmarks.tracing import span
+from generator.compression import COMPRESSION_EXTENSIONS
+
+# Exit code of a run that found regressions against results history
+REGRESSION_EXIT_CODE = 3
+
+# Benchmark classes by name. They only hold options, modules that run a
+# benchmark and generate its data import Modin and ML libraries, so they are
+# imported when the benchmark is loaded.
+_benchmarks = OrderedDict()
+
+
+def register_benchmark(name: str):
+    def register(benchmark_class):
+        _benchmarks[name] = benchmark_class
+        return benchmark_class
+
+    return register
 
 
 class Benchmark(abc.ABC):
-    def __init__(self, reuse: bool, parallel: bool, num_cpus: int):
+    _module_name = None
+    # Launcher options that define the dataset of a benchmark, tuned
+    # configurations are kept per dataset
+    _size_options = ()
+    # Phases the benchmark can start from with --from-phase, the same as
+    # PHASES of its module
+    _phases = ("Reading",)
+    # Whether the benchmark runs with -m all
+    _in_all = True
+    # Why the dataset can't be sharded over a Ray cluster, None if it can
+    _unshardable_reason = None
+    # Whether the benchmark runs with --load-clients
+    _has_load_mode = False
+    # Launcher options used by this benchmark only, history of its results
+    # doesn't depend on options of other benchmarks
+    _own_options = ()
+
+    def __init__(self, reuse: bool, parallel: bool, num_cpus: int, **kwargs):
         self._reuse = reuse
         self._parallel = parallel
         self._num_cpus = num_cpus
+        self._checkpoint_dir = kwargs.get("checkpoint_dir")
+        self._from_phase = kwargs.get("from_phase", "Reading")
+        self._reader = kwargs.get("reader", "modin")
+        self._report_memory = kwargs.get("report_memory", False)
+        self._compact = kwargs.get("compact_dtypes", False)
+        block_size = kwargs.get("read_block_size")
+        self._block_size = block_size * 2**20 if block_size is not None else None
+        self._distributed = kwargs.get("cluster_address") is not None
+        self._load_clients = kwargs.get("load_clients")
+        self._load_duration = kwargs.get("load_duration", 60.0)
+        memory_budget = kwargs.get("memory_budget")
+        self._memory_budget = int(memory_budget * 2**30) if memory_budget is not None else None
+        self._compression = kwargs.get("compression")
+        self._in_memory = kwargs.get("in_memory", False)
+        self._generate_only = kwargs.get("generate_only", False)
+        self.data_files = []
+        self._module = None
+        self._generators = None
 
     @abc.abstractmethod
     def run(self, **kwargs):
         pass
 
+    def load(self):
+        """Import benchmark and generator modules, return time it took."""
+        t0 = time.time()
+        with span("Import", "startup"):
+            self._module = importlib.import_module(self._module_name)
+            self._generators = importlib.import_module("generator.generator")
+        return time.time() - t0
+
+    def _generator(self, generator_class_name, output_file_name, **options):
+        # Compressed frames are read in parallel the same way as blocks of
+        # plain files, so their size follows the read block size.
+        generator_class = getattr(self._generators, generator_class_name)
+        return generator_class(
+            output_file_name,
+            self._reuse,
+            self._parallel,
+            self._num_cpus,
+            self._memory_budget,
+            self._compression,
+            self._block_size,
+            **options,
+        )
+
+    def _generate_in_memory(self, name, generate):
+        # Frames are generated by Ray tasks right into the object store, only
+        # schemas are written, because dtypes of benchmarks are derived from them.
+        print(f"Generating {name} data in memory")
+        t0 = time.time()
+        with span("Generation", "generation"):
+            dataset = generate()
+        return dataset, time.time() - t0
+
+    @staticmethod
+    def _benchmark_time(res: OrderedDict, seconds: float):
+        # Checkpoints are saved for later runs, their writing is reported
+        # separately and is not part of the benchmark time
+        return seconds - res.get("Checkpoint saving", 0.0)
+
+    @staticmethod
+    def _add_generation_time(res: OrderedDict, seconds: float):
+        res["Generation"] = seconds
+        res.move_to_end("Generation", last=False)
+
+    def _run_distributed(self, name, generator_class, records, dtype, run_phases):
+        # Shards are generated and read on the nodes of the Ray cluster the
+        # launcher is connected to, every node reads its local shard.
+        from benchmarks.distributed import (
+            cluster_nodes,
+            generate_shards,
+            read_shards,
+            throughput_results,
+        )
+
+        nodes = cluster_nodes()
+        print(f'{"Reusing" if self._reuse else "Generating"} {len(nodes)} shards of {name} data file {self._datafile}')
+        with span("Generation", "generation", rows=records):
+            shards = generate_shards(generator_class, self._datafile, records, self._reuse, nodes)
+        self.data_files = [f for f, _ in shards]
+        for (shard_file, seconds), node in zip(shards, nodes):
+            print(f"Shard {shard_file} on node {node['NodeManagerAddress']} took {seconds} seconds")
+        if self._generate_only:
+            return OrderedDict(), 0.0
+
+        print(f"Running distributed {name} benchmark on {len(nodes)} nodes")
+        t0 = time.time()
+        res = OrderedDict()
+        t_read = time.time()
+        df, stats = read_shards([f for f, _ in shards], nodes, dtype, self._block_size)
+        df.shape  # to trigger real execution
+        res["Reading"] = time.time() - t_read
+        res.update(throughput_results(stats, res["Reading"]))
+        run_phases(df, res)
+        t1 = time.time()
+        return res, t1 - t0
 
+
+@register_benchmark("taxi")
 class TaxiBenchmark(Benchmark):
+    _module_name = "benchmarks.taxi"
+    _phases = ("Reading", "Queries")
+    _has_load_mode = True
+    _size_options = ("taxi_records", "taxi_time_ordered")
+    _own_options = (
+        "taxi_records",
+        "taxi_fixed_timestamps",
+        "taxi_categorical",
+        "taxi_time_ordered",
+    )
     _datafile = "taxi.csv"
     _records = 20_000_000
 
     def __init__(self, reuse: bool, parallel: bool, num_cpus: int, **kwargs):
-        super().__init__(reuse, parallel, num_cpus)
+        super().__init__(reuse, parallel, num_cpus, **kwargs)
         self._records = kwargs.pop("taxi_records", self._records)
+        self._fixed_timestamps = kwargs.pop("taxi_fixed_timestamps", False)
+        self._categorical = kwargs.pop("taxi_categorical", False)
+        self._time_ordered = kwargs.pop("taxi_time_ordered", False)
+        if self._time_ordered:
+            # Time ordered trips are kept apart from random ones for reuse
+            self._datafile = "taxi_ordered.csv"
 
     def run(self, **kwargs) -> tuple[OrderedDict, float]:
-        print(f'{"Reusing" if self._reuse else "Generating"} Taxi data file {self._datafile}')
-        gen = TaxiGenerator(self._datafile, self._reuse, self._parallel, self._num_cpus)
-        gen.generate(self._records)
+        if self._distributed:
+            # Shards write their schemas on the nodes, dtypes are derived
+            # from the schema of the whole dataset written here
+            self._generator("TaxiGenerator", self._datafile).write_schema()
+            return self._run_distributed(
+                "Taxi",
+                self._generators.TaxiGenerator,
+                self._records,
+                self._module.get_column_types(self._datafile, self._categorical, self._compact),
+                self._module.run_queries,
+            )
+
+        gen = self._generator("TaxiGenerator", self._datafile, time_ordered=self._time_ordered)
+        if self._in_memory:
+            gen.write_schema()
+            dataset, generation_time = self._generate_in_memory(
+                "Taxi",
+                lambda: gen.generate_frame(
+                    self._records,
+                    self._module.get_column_types(self._datafile, self._categorical, self._compact),
+                ),
+            )
+        else:
+            print(f'{"Reusing" if self._reuse else "Generating"} Taxi data file {self._datafile}')
+            with span("Generation", "generation", rows=self._records):
+                self.data_files = [gen.generate(self._records)]
+            dataset = self.data_files[0]
+            if self._generate_only:
+                return OrderedDict(), 0.0
+
+        if self._load_clients is not None:
+            print("Running Taxi queries load")
+            t0 = time.time()
+            res = self._module.run_load(
+                self.data_files[0],
+                self._load_clients,
+                self._load_duration,
+                reader=self._reader,
+                block_size=self._block_size,
+                fixed_timestamps=self._fixed_timestamps,
+                categorical=self._categorical,
+                compact=self._compact,
+                time_ordered=self._time_ordered,
+            )
+            return res, time.time() - t0
 
         print("Running Taxi benchmark")
         t0 = time.time()
-        res = taxi_run(self._datafile)
+        res = self._module.run(
+            dataset,
+            checkpoint_dir=self._checkpoint_dir,
+            from_phase=self._from_phase,
+            reader=self._reader,
+            block_size=self._block_size,
+            fixed_timestamps=self._fixed_timestamps,
+            categorical=self._categorical,
+            compact=self._compact,
+            report_memory=self._report_memory,
+            time_ordered=self._time_ordered,
+        )
         t1 = time.time()
-        return res, t1 - t0
+        if self._in_memory:
+            self._add_generation_time(res, generation_time)
+        return res, self._benchmark_time(res, t1 - t0)
 
 
+@register_benchmark("census")
 class CensusBenchmark(Benchmark):
+    _module_name = "benchmarks.census"
+    _phases = ("Reading", "ETL", "ML")
+    _has_load_mode = True
+    _size_options = ("census_records",)
+    _own_options = ("census_records", "census_streaming", "census_validate_streaming")
     _datafile = "census.csv"
     _records = 21721923
 
     def __init__(self, reuse: bool, parallel: bool, num_cpus: int, **kwargs):
-        super().__init__(reuse, parallel, num_cpus)
+        super().__init__(reuse, parallel, num_cpus, **kwargs)
         self._records = kwargs.pop("census_records", self._records)
+        self._streaming = kwargs.pop("census_streaming", False)
+        self._validate_streaming = kwargs.pop("census_validate_streaming", False)
 
     def run(self, **kwargs) -> tuple[OrderedDict, float]:
-        print(f'{"Reusing" if self._reuse else "Generating"} Census data file {self._datafile}')
-        gen = CensusGenerator(self._datafile, self._reuse, self._parallel, self._num_cpus)
-        gen.generate(self._records)
+        if self._distributed:
+            # Shards write their schemas on the nodes, dtypes are derived
+            # from the schema of the whole dataset written here
+            self._generator("CensusGenerator", self._datafile).write_schema()
+            return self._run_distributed(
+                "Census",
+                self._generators.CensusGenerator,
+                self._records,
+                self._module.get_dtypes(self._datafile, self._compact),
+                lambda df, res: self._module.run_ml(*self._module.run_etl(df, res), res),
+            )
+
+        gen = self._generator("CensusGenerator", self._datafile)
+        if self._in_memory:
+            gen.write_schema()
+            dataset, generation_time = self._generate_in_memory(
+                "Census",
+                lambda: gen.generate_frame(
+                    self._records, self._module.get_dtypes(self._datafile, self._compact)
+                ),
+            )
+        else:
+            print(f'{"Reusing" if self._reuse else "Generating"} Census data file {self._datafile}')
+            with span("Generation", "generation", rows=self._records):
+                self.data_files = [gen.generate(self._records)]
+            dataset = self.data_files[0]
+            if self._generate_only:
+                return OrderedDict(), 0.0
+
+        if self._load_clients is not None:
+            print("Running Census ETL load")
+            t0 = time.time()
+            res = self._module.run_load(
+                self.data_files[0],
+                self._load_clients,
+                self._load_duration,
+                reader=self._reader,
+                block_size=self._block_size,
+                compact=self._compact,
+            )
+            return res, time.time() - t0
 
         print("Running Census benchmark")
         t0 = time.time()
-        res = census_run(self._datafile)
+        res = self._module.run(
+            dataset,
+            checkpoint_dir=self._checkpoint_dir,
+            from_phase=self._from_phase,
+            reader=self._reader,
+            block_size=self._block_size,
+            compact=self._compact,
+            report_memory=self._report_memory,
+            streaming=self._streaming,
+            validate_streaming=self._validate_streaming,
+        )
         t1 = time.time()
-        return res, t1 - t0
+        if self._in_memory:
+            self._add_generation_time(res, generation_time)
+        return res, self._benchmark_time(res, t1 - t0)
 
 
+@register_benchmark("plasticc")
 class PlasticcBenchmark(Benchmark):
+    _module_name = "benchmarks.plasticc"
+    _phases = ("Reading", "ETL", "ML")
+    _unshardable_reason = "objects of its data and metadata files have to match"
+    _size_options = (
+        "training_set_records",
+        "test_set_records",
+        "training_set_metadata_records",
+        "test_set_metadata_records",
+    )
+    _own_options = _size_options + (
+        "plasticc_groupby",
+        "plasticc_validate_groupby",
+        "plasticc_pipelined",
+        "plasticc_dmatrix",
+        "plasticc_dmatrix_cache",
+    )
     _datafile_prefix = "plasticc"
     _training_set_records = 1_421_705
     _test_set_records = 45_365_310
@@ -75,37 +350,166 @@ class PlasticcBenchmark(Benchmark):
     _test_set_metadata_records = 349_289
 
     def __init__(self, reuse: bool, parallel: bool, num_cpus: int, **kwargs):
-        super().__init__(reuse, parallel, num_cpus)
+        super().__init__(reuse, parallel, num_cpus, **kwargs)
         self._training_set_records = kwargs.pop("training_set_records", self._training_set_records)
         self._test_set_records = kwargs.pop("test_set_records", self._test_set_records)
         self._training_set_metadata_records = kwargs.pop("training_set_metadata_records", self._training_set_metadata_records)
         self._test_set_metadata_records = kwargs.pop("test_set_metadata_records", self._test_set_metadata_records)
+        self._groupby_impl = kwargs.pop("plasticc_groupby", "modin")
+        self._validate_groupby = kwargs.pop("plasticc_validate_groupby", False)
+        self._pipelined = kwargs.pop("plasticc_pipelined", False)
+        self._dmatrix_type = kwargs.pop("plasticc_dmatrix", "dmatrix")
+        self._dmatrix_cache_dir = kwargs.pop("plasticc_dmatrix_cache", None)
 
     def run(self) -> tuple[OrderedDict, float]:
-        print(f'{"Reusing" if self._reuse else "Generating"} Plasticc data files with prefix {self._datafile_prefix}')
-        gen = PlasticcGenerator(self._datafile_prefix, self._reuse, self._parallel, self._num_cpus)
-        output_files = list(
-            gen.generate(
-                self._training_set_records,
-                self._test_set_records,
-                self._training_set_metadata_records,
-                self._test_set_metadata_records,
-            )
+        gen = self._generator("PlasticcGenerator", self._datafile_prefix)
+        records = (
+            self._training_set_records,
+            self._test_set_records,
+            self._training_set_metadata_records,
+            self._test_set_metadata_records,
         )
+        if self._in_memory:
+            gen.write_schema()
+            dtypes, meta_dtypes = self._module.get_dtypes(*gen.data_file_names(), self._compact)
+            datasets, generation_time = self._generate_in_memory(
+                "Plasticc",
+                lambda: gen.generate_frames(*records, dtypes, meta_dtypes),
+            )
+        else:
+            print(f'{"Reusing" if self._reuse else "Generating"} Plasticc data files with prefix {self._datafile_prefix}')
+            with span("Generation", "generation"):
+                datasets = list(gen.generate(*records))
+            self.data_files = datasets
+            if self._generate_only:
+                return OrderedDict(), 0.0
 
         print("Running Plasticc benchmark")
         t0 = time.time()
-        res = plasticc_run(*output_files)
+        res = self._module.run(
+            *datasets,
+            groupby_impl=self._groupby_impl,
+            validate_groupby=self._validate_groupby,
+            pipelined=self._pipelined,
+            dmatrix_type=self._dmatrix_type,
+            dmatrix_cache_dir=self._dmatrix_cache_dir,
+            checkpoint_dir=self._checkpoint_dir,
+            from_phase=self._from_phase,
+            reader=self._reader,
+            block_size=self._block_size,
+            compact=self._compact,
+        )
         t1 = time.time()
-        return res, t1 - t0
+        if self._in_memory:
+            self._add_generation_time(res, generation_time)
+        return res, self._benchmark_time(res, t1 - t0)
+
+
+@register_benchmark("dbbench")
+class DbbenchBenchmark(Benchmark):
+    _module_name = "benchmarks.dbbench"
+    _phases = ("Reading", "Questions")
+    _unshardable_reason = "lookup tables of joins have unique keys"
+    # Dbbench tables add tens of millions of rows to the suite, so it runs
+    # only when it is selected by name
+    _in_all = False
+    _size_options = (
+        "dbbench_records",
+        "dbbench_cardinality",
+        "dbbench_null_rate",
+        "dbbench_sortedness",
+    )
+    _own_options = _size_options
+    _records = 10_000_000
+    _cardinality = 100_000
+
+    def __init__(self, reuse: bool, parallel: bool, num_cpus: int, **kwargs):
+        super().__init__(reuse, parallel, num_cpus, **kwargs)
+        self._records = kwargs.pop("dbbench_records", self._records)
+        cardinality = kwargs.pop("dbbench_cardinality", None)
+        self._cardinality = int(cardinality) if cardinality is not None else self._cardinality
+        self._null_rate = kwargs.pop("dbbench_null_rate", 0.0)
+        self._sortedness = kwargs.pop("dbbench_sortedness", 0.0)
+        # Datasets with different parameters are kept apart for reuse
+        self._datafile_prefix = (
+            f"dbbench_{self._records}_{self._cardinality}_{self._null_rate}_{self._sortedness}"
+        )
+
+    def run(self) -> tuple[OrderedDict, float]:
+        gen = self._generator("DbbenchGenerator", self._datafile_prefix)
+        print(f'{"Reusing" if self._reuse else "Generating"} Dbbench data files with prefix {self._datafile_prefix}')
+        with span("Generation", "generation"):
+            self.data_files = list(
+                gen.generate(self._records, self._cardinality, self._null_rate, self._sortedness)
+            )
+        if self._generate_only:
+            return OrderedDict(), 0.0
+
+        print("Running Dbbench benchmark")
+        t0 = time.time()
+        res = self._module.run(
+            *self.data_files,
+            checkpoint_dir=self._checkpoint_dir,
+            from_phase=self._from_phase,
+            nulls=self._null_rate > 0,
+            reader=self._reader,
+            block_size=self._block_size,
+            report_memory=self._report_memory,
+        )
+        t1 = time.time()
+        return res, self._benchmark_time(res, t1 - t0)
+
+
+def strip_options(argv: list, flags: list, options: list) -> list:
+    """Remove flags and options together with their values from command line arguments."""
+    result = []
+    skipping = False
+    for arg in argv:
+        if skipping:
+            if not arg.startswith("-"):
+                continue
+            skipping = False
+        name = arg.split("=", 1)[0]
+        if name in flags:
+            continue
+        if name in options:
+            skipping = "=" not in arg
+            continue
+        result.append(arg)
+    return result
+
+
+def run_launcher_subprocess(argv: list) -> tuple[OrderedDict, bool]:
+    """
+    Run launcher with argv in a fresh interpreter and return its JSON results
+    and whether it found regressions against results history. It is used for
+    configurations that can't be changed after an engine has been
+    initialized in the current process.
+    """
+    argv = strip_options(argv, ["-j", "--json"], ["-o", "--output"])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, "results.json")
+        cmd = [sys.executable, os.path.abspath(__file__)] + argv + ["-j", "-o", output]
+        returncode = subprocess.run(cmd).returncode
+        if returncode not in (0, REGRESSION_EXIT_CODE):
+            raise subprocess.CalledProcessError(returncode, cmd)
+        with open(output) as fp:
+            results = json.load(fp, object_pairs_hook=OrderedDict)
+        return results, returncode == REGRESSION_EXIT_CODE
+
+
+def startup_time():
+    """Time from creation of the launcher process until now, None without psutil."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return time.time() - psutil.Process().create_time()
 
 
 def main():
-    benchmarks = {
-        "taxi": TaxiBenchmark,
-        "census": CensusBenchmark,
-        "plasticc": PlasticcBenchmark,
-    }
+    startup = startup_time()
+    benchmarks = _benchmarks
 
     parser = argparse.ArgumentParser(description="Generate dataset for a benchmark.")
     parser.add_argument(
@@ -113,7 +517,7 @@ def main():
         "--mode",
         choices=list(benchmarks.keys()) + ["all"],
         required=True,
-        help="Benchmark to run.",
+        help="Benchmark to run, all runs every benchmark except dbbench.",
     )
     parser.add_argument(
         "-tr",
@@ -123,6 +527,30 @@ def main():
         default=TaxiBenchmark._records,
         help="Override default number of records for Taxi benchmark.",
     )
+    parser.add_argument(
+        "-tft",
+        "--taxi-fixed-timestamps",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Parse Taxi timestamps with the fixed YYYY-MM-DD HH:MM:SS layout parser. Requires --reader chunked.",
+    )
+    parser.add_argument(
+        "-tc",
+        "--taxi-categorical",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Load Taxi string columns as categoricals using dictionaries recorded by the generator.",
+    )
+    parser.add_argument(
+        "-tto",
+        "--taxi-time-ordered",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Generate Taxi trips ordered by pickup time with realistic durations for window and resample queries.",
+    )
     parser.add_argument(
         "-cr",
         "--census-records",
@@ -131,6 +559,22 @@ def main():
         default=CensusBenchmark._records,
         help="Override default number of records for Census benchmark.",
     )
+    parser.add_argument(
+        "-cs",
+        "--census-streaming",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Train Census Ridge incrementally over blocks of the data file instead of loading it.",
+    )
+    parser.add_argument(
+        "-cvs",
+        "--census-validate-streaming",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Check that streaming Census Ridge gives the model fitted in memory.",
+    )
     parser.add_argument(
         "-trsr",
         "--training-set-records",
@@ -163,6 +607,74 @@ def main():
         default=PlasticcBenchmark._test_set_metadata_records,
         help="Override default number of records to generate for test set metadata in Plasticc benchmark.",
     )
+    parser.add_argument(
+        "-dbr",
+        "--dbbench-records",
+        required=False,
+        type=int,
+        default=DbbenchBenchmark._records,
+        help="Override default number of records of groupby table and left table of joins in Dbbench benchmark.",
+    )
+    parser.add_argument(
+        "--dbbench-cardinality",
+        required=False,
+        type=float,
+        default=DbbenchBenchmark._cardinality,
+        help="Number of distinct values of high cardinality keys in Dbbench benchmark, from 1e2 to 1e8.",
+    )
+    parser.add_argument(
+        "--dbbench-null-rate",
+        required=False,
+        type=float,
+        default=0.0,
+        help="Share of null values in every column of Dbbench groupby table and left table of joins.",
+    )
+    parser.add_argument(
+        "--dbbench-sortedness",
+        required=False,
+        type=float,
+        default=0.0,
+        help="Share of rows of Dbbench groupby table and left table of joins that are in key order, 1 is fully sorted.",
+    )
+    parser.add_argument(
+        "-pgb",
+        "--plasticc-groupby",
+        choices=["modin", "segment"],
+        required=False,
+        default="modin",
+        help="Groupby implementation for Plasticc ETL. \"segment\" uses reduceat kernels over contiguous object_id runs.",
+    )
+    parser.add_argument(
+        "-pvg",
+        "--plasticc-validate-groupby",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Check segment groupby results against Modin groupby after Plasticc ETL."
+    )
+    parser.add_argument(
+        "-ppl",
+        "--plasticc-pipelined",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Run Plasticc training and test set reading and ETL as concurrent branches."
+    )
+    parser.add_argument(
+        "-pdm",
+        "--plasticc-dmatrix",
+        choices=["dmatrix", "quantile"],
+        required=False,
+        default="dmatrix",
+        help="Type of XGBoost matrices to build in Plasticc ML.",
+    )
+    parser.add_argument(
+        "-pdc",
+        "--plasticc-dmatrix-cache",
+        required=False,
+        type=str,
+        help="Directory to cache Plasticc DMatrix binaries in. They are keyed by ETL output hash. Not supported with --plasticc-dmatrix quantile.",
+    )
     parser.add_argument(
         "-ru",
         "--reuse-dataset-files",
@@ -171,6 +683,48 @@ def main():
         default=False,
         help="Skip dataset generation phase and reuse datasets generated on previous runs."
     )
+    parser.add_argument(
+        "-cd",
+        "--checkpoint-dir",
+        required=False,
+        type=str,
+        help="Directory to store phase outputs in. They are keyed by input dataset and allow resuming with --from-phase.",
+    )
+    parser.add_argument(
+        "-fp",
+        "--from-phase",
+        choices=["Reading", "ETL", "Queries", "Questions", "ML"],
+        required=False,
+        default="Reading",
+        help="Start benchmarks from this phase using outputs of the previous phase saved in --checkpoint-dir.",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=["modin", "chunked"],
+        required=False,
+        default="modin",
+        help="CSV reader to use. \"chunked\" splits files into byte ranges parsed in parallel by Arrow.",
+    )
+    parser.add_argument(
+        "--read-block-size",
+        required=False,
+        type=int,
+        help="Size of byte ranges in MB for the chunked CSV reader.",
+    )
+    parser.add_argument(
+        "--compact-dtypes",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Load integer columns with the narrowest types that hold value ranges declared by the generator.",
+    )
+    parser.add_argument(
+        "--report-memory",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Report memory used by loaded data frames.",
+    )
     parser.add_argument(
         "-np",
         "--no-parallel",
@@ -185,6 +739,211 @@ def main():
         type=int,
         help="Specify maximum number of CPU cores to use."
     )
+    parser.add_argument(
+        "--npartitions",
+        required=False,
+        type=int,
+        help="Number of partitions Modin splits frames into along every axis. By default it is the number of CPU cores.",
+    )
+    parser.add_argument(
+        "--autotune",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Search the number of CPU cores, --npartitions and, with --reader chunked, --read-block-size with the shortest benchmark time, every trial runs in a fresh process. Best configurations are stored in --tuning-profile.",
+    )
+    parser.add_argument(
+        "--autotune-trials",
+        required=False,
+        type=int,
+        default=12,
+        help="Maximal number of configurations tried by --autotune for every benchmark.",
+    )
+    parser.add_argument(
+        "--tuning-profile",
+        required=False,
+        type=str,
+        default="tuning_profile.json",
+        help="File with best configurations found by --autotune. A configuration tuned for the benchmark, its dataset, engine and reader is used for options that are not given on command line.",
+    )
+    parser.add_argument(
+        "--ignore-tuning-profile",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Don't use configurations from --tuning-profile.",
+    )
+    parser.add_argument(
+        "--cluster-address",
+        required=False,
+        type=str,
+        help="Address of a Ray cluster to run distributed benchmarks on. Every node generates and reads its own dataset shard.",
+    )
+    parser.add_argument(
+        "--local-cluster-nodes",
+        required=False,
+        type=int,
+        help="Start a Ray cluster with this number of nodes on the local host and run distributed benchmarks on it.",
+    )
+    parser.add_argument(
+        "--cpu-list",
+        required=False,
+        type=str,
+        help="Pin benchmark, engine workers and generator workers to these CPU cores, e.g. 0-15,32-47.",
+    )
+    parser.add_argument(
+        "--numa-nodes",
+        required=False,
+        type=str,
+        help="Pin benchmark, engine workers and generator workers to CPU cores of these NUMA nodes, e.g. 0 or 0,1.",
+    )
+    parser.add_argument(
+        "--affinity-compare",
+        required=False,
+        nargs="+",
+        metavar="NUMA_NODES",
+        help="Run benchmarks once for every NUMA node set, e.g. \"0\" \"0,1\" to compare one socket with both.",
+    )
+    parser.add_argument(
+        "--profile",
+        required=False,
+        type=str,
+        metavar="DIR",
+        help="Profile every benchmark phase and write cProfile stats, folded stacks for flame graphs and operator tables to this directory.",
+    )
+    parser.add_argument(
+        "--profile-top",
+        required=False,
+        type=int,
+        default=20,
+        help="Number of Modin and pandas operators to list in per phase operator tables.",
+    )
+    parser.add_argument(
+        "--trace",
+        required=False,
+        type=str,
+        metavar="DIR",
+        help="Record spans of generation, file reads, phases and ML steps and write them to this directory as Chrome trace (trace.json) and OpenMetrics text (metrics.prom).",
+    )
+    parser.add_argument(
+        "--history",
+        required=False,
+        type=str,
+        metavar="FILE",
+        help="Append results to this JSON lines history keyed by git revision, engine, number of CPU cores, benchmark options and dataset.",
+    )
+    parser.add_argument(
+        "--compare-history",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Compare results with earlier runs of the same configuration in --history and exit with code 3 if any phase regressed.",
+    )
+    parser.add_argument(
+        "--regression-sigmas",
+        required=False,
+        type=float,
+        default=3.0,
+        help="Number of standard deviations of history runs a phase has to be worse than their mean to be a regression.",
+    )
+    parser.add_argument(
+        "--regression-threshold",
+        required=False,
+        type=float,
+        default=5.0,
+        help="Minimal difference from mean of history runs in percent for a phase to be a regression.",
+    )
+    parser.add_argument(
+        "--load-clients",
+        required=False,
+        type=int,
+        nargs="+",
+        metavar="CLIENTS",
+        help="Run load mode instead of the benchmark: Taxi queries or Census ETL are repeated by every number of concurrent clients, e.g. 1 2 4 8, over a shared dataset. Reports queries per second, latency percentiles and the saturation point.",
+    )
+    parser.add_argument(
+        "--load-duration",
+        required=False,
+        type=float,
+        default=60.0,
+        help="Duration of load for every number of clients in seconds.",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        required=False,
+        type=float,
+        metavar="GB",
+        help="Run out of core within this memory budget in GB: datasets are generated in chunks and Ray object store is limited to a part of the budget, the rest is left for heaps of workers and the driver. Partitions that don't fit are spilled to disk.",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        required=False,
+        type=str,
+        help="Directory for objects spilled by Ray in --memory-budget mode. By default Ray session directory is used.",
+    )
+    parser.add_argument(
+        "--memory-reference",
+        action='store_true',
+        required=False,
+        default=False,
+        help="With --memory-budget, also run benchmarks in memory in a separate process and report slowdown of every phase.",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Generate datasets as Modin frames partitioned in Ray object store instead of files and run benchmarks over them without Reading phase.",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=list(COMPRESSION_EXTENSIONS.keys()),
+        required=False,
+        help="Generate datasets as CSV files compressed in independently decodable frames of --read-block-size and decompress them in parallel while reading. Requires --reader chunked.",
+    )
+    parser.add_argument(
+        "--runs",
+        required=False,
+        type=int,
+        default=1,
+        help="Run every benchmark this number of times in the same process. The first run is reported as cold and the mean of the rest as warm, their difference is compile overhead of the engine.",
+    )
+    parser.add_argument(
+        "--cold-warm",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Characterize cold start and warm runs of Modin on Ray and HDK: every engine runs benchmarks in a fresh process at least 3 times over the same datasets.",
+    )
+    parser.add_argument(
+        "--generate-only",
+        action='store_true',
+        required=False,
+        default=False,
+        help="Only generate dataset files, benchmarks are not run.",
+    )
+    parser.add_argument(
+        "--overlap-generation",
+        action='store_true',
+        required=False,
+        default=False,
+        help="With -m all, generate the dataset of the next benchmark in background on --generation-cpus reserved CPU cores while the current benchmark runs on the rest of the cores.",
+    )
+    parser.add_argument(
+        "--generation-cpus",
+        required=False,
+        type=int,
+        default=1,
+        help="Number of CPU cores reserved for background generation with --overlap-generation.",
+    )
+    parser.add_argument(
+        "--generation-memory",
+        required=False,
+        type=float,
+        default=4.0,
+        metavar="GB",
+        help="Memory in GB that has to be available to start background generation of a dataset, otherwise the benchmark generates it itself. It is checked with psutil when it is installed.",
+    )
     parser.add_argument(
         "--hdk",
         action='store_true',
@@ -209,7 +968,351 @@ def main():
     )
 
     args = parser.parse_args()
-    modes = [args.mode] if args.mode != "all" else benchmarks.keys()
+    modes = (
+        [args.mode]
+        if args.mode != "all"
+        else [name for name, benchmark_class in benchmarks.items() if benchmark_class._in_all]
+    )
+    if not 1e2 <= args.dbbench_cardinality <= 1e8:
+        parser.error("--dbbench-cardinality has to be from 1e2 to 1e8")
+    if not 0 <= args.dbbench_null_rate < 1 or not 0 <= args.dbbench_sortedness <= 1:
+        parser.error("--dbbench-null-rate and --dbbench-sortedness are shares from 0 to 1")
+    if args.plasticc_dmatrix == "quantile" and args.plasticc_dmatrix_cache is not None:
+        parser.error("XGBoost can't serialize QuantileDMatrix, --plasticc-dmatrix-cache requires --plasticc-dmatrix dmatrix")
+    if args.compare_history and args.history is None:
+        parser.error("--compare-history requires --history")
+    if args.memory_budget is not None:
+        if args.memory_budget <= 0:
+            parser.error("--memory-budget has to be positive")
+        if args.hdk:
+            parser.error("Memory budget requires Modin on Ray")
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("Memory budget of a Ray cluster is set when the cluster is started")
+    elif args.memory_reference:
+        parser.error("--memory-reference requires --memory-budget")
+    if args.in_memory:
+        if args.hdk:
+            parser.error("In memory datasets are generated by Ray tasks and require Modin on Ray")
+        conflicting = {
+            "--compression": args.compression is not None,
+            "--checkpoint-dir": args.checkpoint_dir is not None,
+            "--load-clients": args.load_clients is not None,
+            "--plasticc-pipelined": args.plasticc_pipelined,
+            "--taxi-time-ordered": args.taxi_time_ordered,
+            "--census-streaming": args.census_streaming,
+            "--cluster-address": args.cluster_address is not None,
+            "--local-cluster-nodes": args.local_cluster_nodes is not None,
+        }
+        for option, used in conflicting.items():
+            if used:
+                parser.error(f"{option} requires datasets in files and can't be used with --in-memory")
+        if args.mode == "dbbench":
+            parser.error("Dbbench datasets are generated as files only and can't be used with --in-memory")
+    if args.compression is not None:
+        if args.reader != "chunked":
+            parser.error("Compressed datasets are read with --reader chunked only")
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("Dataset shards can't be compressed")
+    if args.taxi_time_ordered:
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("Dataset shards can't be time ordered")
+    if args.census_validate_streaming and not args.census_streaming:
+        parser.error("--census-validate-streaming requires --census-streaming")
+    if args.census_streaming:
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("Streaming Census ML can't run distributed benchmarks")
+        if args.checkpoint_dir is not None:
+            parser.error("Streaming Census ML runs in one phase and can't be checkpointed")
+    if args.cluster_address is not None or args.local_cluster_nodes is not None:
+        if args.mode == "all":
+            modes = [mode for mode in modes if benchmarks[mode]._unshardable_reason is None]
+        elif benchmarks[args.mode]._unshardable_reason is not None:
+            parser.error(
+                f"{args.mode} dataset can't be sharded because {benchmarks[args.mode]._unshardable_reason}"
+            )
+    if args.load_clients is not None:
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("Load mode can't run distributed benchmarks")
+        if args.mode == "all":
+            modes = [mode for mode in modes if benchmarks[mode]._has_load_mode]
+        elif not benchmarks[args.mode]._has_load_mode:
+            parser.error("Load mode runs Taxi queries and Census ETL only")
+    if args.from_phase != "Reading":
+        if args.checkpoint_dir is None:
+            parser.error("Resuming from a later phase with --from-phase requires --checkpoint-dir")
+        for mode in modes:
+            if args.from_phase not in benchmarks[mode]._phases:
+                parser.error(
+                    f'{mode} benchmark has no phase "{args.from_phase}", available phases: {", ".join(benchmarks[mode]._phases)}'
+                )
+    if args.checkpoint_dir is not None:
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("Distributed benchmarks read shards on cluster nodes and can't be checkpointed")
+        if args.plasticc_pipelined:
+            parser.error("Pipelined Plasticc overlaps Reading with ETL and can't be checkpointed")
+    if args.runs < 1:
+        parser.error("--runs has to be at least 1")
+    if args.generate_only and args.in_memory:
+        parser.error("In memory datasets are not kept and can't be generated only")
+    if args.cold_warm:
+        if args.in_memory:
+            parser.error("--cold-warm runs engines in separate processes over dataset files and can't be used with --in-memory")
+        if args.cluster_address is not None or args.local_cluster_nodes is not None:
+            parser.error("--cold-warm can't run distributed benchmarks")
+        if args.affinity_compare is not None:
+            parser.error("--cold-warm can't be used with --affinity-compare")
+    if args.autotune:
+        conflicting = {
+            "--affinity-compare": args.affinity_compare is not None,
+            "--cold-warm": args.cold_warm,
+            "--load-clients": args.load_clients is not None,
+            "--generate-only": args.generate_only,
+            "--cluster-address": args.cluster_address is not None,
+            "--local-cluster-nodes": args.local_cluster_nodes is not None,
+        }
+        for option, used in conflicting.items():
+            if used:
+                parser.error(f"{option} can't be used with --autotune")
+        if args.autotune_trials < 1:
+            parser.error("--autotune-trials has to be at least 1")
+
+    pinning = {
+        "--cpu-list": args.cpu_list is not None,
+        "--numa-nodes": args.numa_nodes is not None,
+        "--affinity-compare": args.affinity_compare is not None,
+    }
+    for option, used in pinning.items():
+        if used and not hasattr(os, "sched_setaffinity"):
+            parser.error(f"{option} pins processes to CPU cores, which is only supported on Linux")
+
+    if args.overlap_generation:
+        if args.mode != "all":
+            parser.error("--overlap-generation overlaps generation with the previous benchmark and requires -m all")
+        conflicting = {
+            "--in-memory": args.in_memory,
+            "--affinity-compare": args.affinity_compare is not None,
+            "--cold-warm": args.cold_warm,
+            "--autotune": args.autotune,
+            "--cluster-address": args.cluster_address is not None,
+            "--local-cluster-nodes": args.local_cluster_nodes is not None,
+        }
+        for option, used in conflicting.items():
+            if used:
+                parser.error(f"{option} can't be used with --overlap-generation")
+        if not hasattr(os, "sched_getaffinity"):
+            parser.error("Reserving CPU cores for background generation is only supported on Linux")
+        if args.generation_cpus < 1:
+            parser.error("--generation-cpus has to be at least 1")
+
+    engine = "hdk" if args.hdk else os.environ.get("MODIN_ENGINE", "ray").lower()
+
+    def tuning_key(name):
+        from benchmarks.autotune import profile_key
+
+        size = {option: getattr(args, option) for option in benchmarks[name]._size_options}
+        return profile_key(name, size, engine, args.reader)
+
+    if not args.autotune and not args.ignore_tuning_profile and os.path.exists(args.tuning_profile):
+        from benchmarks.autotune import load_profile, find_config
+
+        # Engine options are set for the whole process, so they can be
+        # tuned for one benchmark only
+        if len(modes) == 1:
+            config = find_config(load_profile(args.tuning_profile), tuning_key(list(modes)[0]))
+            if config is not None:
+                print("Using tuned configuration", config, "from", args.tuning_profile)
+                for option, value in config.items():
+                    if getattr(args, option) is None:
+                        setattr(args, option, value)
+        else:
+            print("Tuned configurations are not used for more than one benchmark")
+    regressions = False
+
+    if args.autotune:
+        # Engine options can't be changed once the engine is initialized, so
+        # every configuration is tried in a fresh process
+        from benchmarks.autotune import initial_config, search_space, tune, save_config
+
+        benchmark_results = OrderedDict()
+        child_argv = strip_options(
+            sys.argv[1:],
+            ["--autotune", "--compare-history", "--ignore-tuning-profile"],
+            [
+                "-m",
+                "--mode",
+                "--autotune-trials",
+                "--cpus",
+                "--npartitions",
+                "--read-block-size",
+                "--history",
+                "--trace",
+                "--profile",
+            ],
+        ) + ["--ignore-tuning-profile"]
+        if not {"-ru", "--reuse-dataset-files"} & set(child_argv) and not args.in_memory:
+            print("Generating datasets")
+            run_launcher_subprocess(child_argv + ["-m", args.mode, "--generate-only"])
+            child_argv.append("-ru")
+        host_cpus = args.cpus or os.cpu_count()
+        chunked = args.reader == "chunked"
+        for name in modes:
+
+            def run_trial(config):
+                options = []
+                for option, value in config.items():
+                    options += ["--" + option.replace("_", "-"), str(value)]
+                try:
+                    results, _ = run_launcher_subprocess(child_argv + ["-m", name] + options)
+                except subprocess.CalledProcessError as e:
+                    print("Trial failed with exit code", e.returncode)
+                    return float("inf")
+                return results[name]["Total"]
+
+            print("Tuning", name, "benchmark")
+            initial = initial_config(host_cpus, chunked)
+            if args.npartitions is not None:
+                initial["npartitions"] = args.npartitions
+            if chunked and args.read_block_size is not None:
+                initial["read_block_size"] = args.read_block_size
+            best, best_time, history = tune(
+                run_trial, search_space(host_cpus, chunked), initial, args.autotune_trials
+            )
+            save_config(args.tuning_profile, tuning_key(name), best, best_time, len(history))
+            results = OrderedDict()
+            results["Total"] = best_time
+            results["Default total"] = history[0][1]
+            results["Trials"] = len(history)
+            for option, value in best.items():
+                results[f"Tuned {option}"] = value
+            benchmark_results[name] = results
+        print("Tuned configurations are written to", args.tuning_profile)
+        write_results(benchmark_results, args)
+        return
+
+    if args.cold_warm:
+        # Every benchmark starts on a cold engine in its own process.
+        # Datasets are generated beforehand, so that the generator doesn't
+        # initialize the engine before it is measured.
+        benchmark_results = OrderedDict()
+        child_argv = strip_options(
+            sys.argv[1:],
+            ["--cold-warm", "--hdk"],
+            ["-m", "--mode", "--runs", "--trace", "--profile"],
+        )
+        if not {"-ru", "--reuse-dataset-files"} & set(child_argv):
+            print("Generating datasets")
+            run_launcher_subprocess(child_argv + ["-m", args.mode, "--generate-only"])
+            child_argv.append("-ru")
+        child_argv += ["--runs", str(max(args.runs, 3))]
+        for name in modes:
+            for engine, engine_args in (("Ray", []), ("HDK", ["--hdk"])):
+                print("Running", name, "benchmark on", engine)
+                results, regressed = run_launcher_subprocess(child_argv + ["-m", name] + engine_args)
+                regressions |= regressed
+                for result_name, benchmark_result in results.items():
+                    benchmark_results[f"{result_name} [{engine}]"] = benchmark_result
+        write_results(benchmark_results, args)
+        if regressions:
+            sys.exit(REGRESSION_EXIT_CODE)
+        return
+
+    if args.affinity_compare is not None:
+        # Affinity of engine workers is inherited when they are started, so
+        # every configuration runs in its own process.
+        benchmark_results = OrderedDict()
+        child_argv = strip_options(
+            sys.argv[1:], [], ["--affinity-compare", "--cpu-list", "--numa-nodes", "--trace"]
+        )
+        for i, numa_nodes in enumerate(args.affinity_compare):
+            # Datasets generated for the first configuration are reused by the rest
+            reuse_args = {"-ru", "--reuse-dataset-files"}
+            reuse = ["-ru"] if i > 0 and not reuse_args & set(child_argv) else []
+            trace = []
+            if args.trace is not None:
+                trace = ["--trace", os.path.join(args.trace, f"numa-{numa_nodes}")]
+            results, regressed = run_launcher_subprocess(
+                child_argv + reuse + trace + ["--numa-nodes", numa_nodes]
+            )
+            regressions |= regressed
+            for name, benchmark_result in results.items():
+                benchmark_results[f"{name} [NUMA {numa_nodes}]"] = benchmark_result
+        write_results(benchmark_results, args)
+        if regressions:
+            sys.exit(REGRESSION_EXIT_CODE)
+        return
+
+    topology = None
+    if args.cpu_list is not None or args.numa_nodes is not None:
+        from benchmarks.affinity import parse_cpu_list, numa_node_cpus, set_affinity
+        from benchmarks.affinity import topology as get_topology
+
+        if args.cpu_list is not None:
+            cpus = parse_cpu_list(args.cpu_list)
+        else:
+            cpus = numa_node_cpus(args.numa_nodes)
+        set_affinity(cpus)
+        topology = get_topology()
+        print("Pinned to CPU cores", args.cpu_list or f"of NUMA nodes {args.numa_nodes}")
+        if args.cpus is None:
+            args.cpus = len(cpus)
+
+    background = None
+    if args.overlap_generation and args.reuse_dataset_files:
+        print("Datasets are reused, nothing to generate in background")
+    elif args.overlap_generation:
+        from benchmarks.affinity import set_affinity
+        from benchmarks.background import BackgroundGenerator
+
+        # Reserved cores are taken from the end of the cores the launcher may
+        # run on, benchmarks run on the rest, so generation doesn't take
+        # cores from timed phases.
+        cpus = sorted(os.sched_getaffinity(0))
+        if args.generation_cpus >= len(cpus):
+            parser.error(f"Can't reserve {args.generation_cpus} of {len(cpus)} CPU cores for background generation")
+        reserved, cpus = cpus[-args.generation_cpus:], cpus[: -args.generation_cpus]
+        set_affinity(cpus)
+        args.cpus = min(args.cpus or len(cpus), len(cpus))
+        print("Running benchmarks on CPU cores", cpus)
+        child_argv = strip_options(
+            sys.argv[1:],
+            [
+                "--overlap-generation",
+                "--compare-history",
+                "--memory-reference",
+                "--hdk",
+                "-j",
+                "--json",
+            ],
+            [
+                "-m",
+                "--mode",
+                "--generation-cpus",
+                "--generation-memory",
+                "--cpu-list",
+                "--numa-nodes",
+                "--cpus",
+                "--npartitions",
+                "--runs",
+                "--history",
+                "--trace",
+                "--profile",
+                "-o",
+                "--output",
+            ],
+        )
+        # Generation options, like block size of compressed frames, are the
+        # ones of this process
+        child_argv.append("--ignore-tuning-profile")
+        background = BackgroundGenerator(
+            os.path.abspath(__file__),
+            child_argv,
+            reserved,
+            int(args.generation_memory * 2**30),
+        )
+
+    if args.npartitions is not None:
+        os.environ["MODIN_NPARTITIONS"] = str(args.npartitions)
+        print("Splitting frames into", args.npartitions, "partitions")
 
     if args.cpus is not None:
         os.environ["MODIN_CPUS"] = str(args.cpus)
@@ -221,16 +1324,206 @@ def main():
         os.environ["MODIN_STORAGE_FORMAT"] = "hdk"
         os.environ["MODIN_ENGINE"] = "native"
 
+    if args.memory_budget is not None:
+        from benchmarks.memory import init_memory_budget, spilled_bytes
+
+        object_store = init_memory_budget(
+            args.cpus if args.cpus is not None else os.cpu_count(),
+            int(args.memory_budget * 2**30),
+            args.spill_dir,
+        )
+        print("Limiting Ray object store to", object_store / 2**30, "GB of", args.memory_budget, "GB budget")
+
+    if args.local_cluster_nodes is not None:
+        from benchmarks.distributed import start_local_cluster
+
+        args.cluster_address = start_local_cluster(
+            args.local_cluster_nodes,
+            args.cpus if args.cpus is not None else os.cpu_count(),
+        )
+    if args.cluster_address is not None:
+        from benchmarks.distributed import init_cluster
+
+        if args.hdk:
+            parser.error("Distributed mode requires Modin on Ray")
+        print("Connecting to Ray cluster at", args.cluster_address)
+        init_cluster(args.cluster_address)
+
+    profiler = None
+    if args.profile is not None:
+        from benchmarks.profiling import PhaseProfiler
+        from benchmarks.timing import add_phase_observer
+
+        profiler = PhaseProfiler(args.profile, args.profile_top)
+        add_phase_observer(profiler)
+
+    tracer = None
+    if args.trace is not None:
+        from benchmarks.tracing import start_tracing
+        from benchmarks.timing import add_phase_observer
+
+        os.makedirs(args.trace, exist_ok=True)
+        tracer = start_tracing()
+        add_phase_observer(tracer)
+
+    if args.history is not None:
+        from benchmarks.history import (
+            run_key,
+            dataset_hash,
+            load_history,
+            append_history,
+            compare_results,
+            print_comparison,
+        )
+
+        engine = "hdk" if args.hdk else os.environ.get("MODIN_ENGINE", "ray").lower()
+        benchmark_options = {
+            option for benchmark_class in benchmarks.values() for option in benchmark_class._own_options
+        }
+
+        def history_key(name):
+            # Results of a benchmark are keyed by engine options and its own
+            # options, so they match between -m all and -m <name> runs
+            options = {
+                option: value
+                for option, value in vars(args).items()
+                if option not in benchmark_options or option in benchmarks[name]._own_options
+            }
+            return run_key(engine, args.cpus or os.cpu_count(), options)
+
+        history = load_history(args.history)
+
     benchmark_results = OrderedDict()
-    for benchmark_name in modes:
+    modes = list(modes)
+    suite_start = time.time()
+    # Every benchmark is paired with the next one, whose dataset is
+    # generated in background while it runs
+    for benchmark_name, next_name in zip(modes, modes[1:] + [None]):
         benchmark_class = benchmarks[benchmark_name]
         kwargs = vars(args)
         benchmark = benchmark_class(args.reuse_dataset_files, not args.no_parallel, args.cpus, **kwargs)
-        results, total_time = benchmark.run()
+        if background is not None:
+            if background.wait(benchmark_name):
+                benchmark._reuse = True
+            if next_name is not None:
+                background.start(next_name)
+        if profiler is not None:
+            profiler.set_prefix(benchmark_name)
+        if tracer is not None:
+            tracer.set_benchmark(benchmark_name)
+        import_time = benchmark.load()
+        if args.memory_budget is not None:
+            spilled = spilled_bytes()
+        runs = []
+        for run in range(args.runs):
+            with span(benchmark_name if args.runs == 1 else f"{benchmark_name} run {run + 1}", "benchmark"):
+                results, total_time = benchmark.run()
+            results["Run"] = total_time
+            runs.append(results)
+            # Later runs go over the same datasets
+            benchmark._reuse = True
+        if args.generate_only:
+            print("Datasets of", benchmark_name, "are generated")
+            continue
+        if args.runs > 1:
+            results = cold_warm_results(runs)
+            total_time = sum(r["Run"] for r in runs)
+        else:
+            del results["Run"]
+        if profiler is not None:
+            profiler.write_engine_timeline()
+            print("Profiles of", benchmark_name, "phases are written to", args.profile)
+        # Modules shared by benchmarks are imported by the first one, so
+        # the rest have shorter imports
+        results["Import"] = import_time
+        results.move_to_end("Import", last=False)
+        if startup is not None:
+            results["Startup"] = startup
+            results.move_to_end("Startup", last=False)
         results["Total"] = total_time
         results.move_to_end("Total", last=False)
+        if args.memory_budget is not None:
+            results["Spilled, MB"] = (spilled_bytes() - spilled) / 2**20
+        if topology is not None:
+            results["Topology"] = topology
         benchmark_results[benchmark_name] = results
 
+        if args.history is not None:
+            dataset = dataset_hash(*benchmark.data_files)
+            if args.compare_history:
+                rows = compare_results(
+                    history,
+                    history_key(benchmark_name),
+                    benchmark_name,
+                    dataset,
+                    results,
+                    args.regression_sigmas,
+                    args.regression_threshold / 100,
+                )
+                print_comparison(benchmark_name, rows)
+                regressions |= any(row[-1] for row in rows)
+            append_history(args.history, history_key(benchmark_name), benchmark_name, dataset, results)
+
+    if background is not None:
+        print("Benchmarks with background generation took", time.time() - suite_start, "seconds")
+
+    if args.memory_reference:
+        # Reference run reuses datasets generated within the budget
+        child_argv = strip_options(
+            sys.argv[1:],
+            ["--memory-reference", "--compare-history"],
+            ["--memory-budget", "--spill-dir", "--history", "--trace", "--profile"],
+        )
+        if not {"-ru", "--reuse-dataset-files"} & set(child_argv):
+            child_argv.append("-ru")
+        print("Running benchmarks in memory for reference")
+        reference, _ = run_launcher_subprocess(child_argv)
+        for name, results in benchmark_results.items():
+            if name in reference:
+                add_slowdowns(results, reference[name])
+
+    if tracer is not None:
+        tracer.write_chrome_trace(os.path.join(args.trace, "trace.json"))
+        tracer.write_openmetrics(os.path.join(args.trace, "metrics.prom"))
+        print("Trace is written to", args.trace)
+
+    write_results(benchmark_results, args)
+    if regressions:
+        sys.exit(REGRESSION_EXIT_CODE)
+
+
+def add_slowdowns(results: OrderedDict, reference: OrderedDict):
+    """Add slowdowns of phases relative to a reference run of the same benchmark."""
+    for phase, value in list(results.items()):
+        # Only phase times, results with units like throughput are skipped
+        if ", " in phase or not isinstance(value, (int, float)):
+            continue
+        if isinstance(reference.get(phase), (int, float)) and reference[phase] > 0:
+            results[f"{phase} slowdown"] = value / reference[phase]
+
+
+def cold_warm_results(runs: list) -> OrderedDict:
+    """
+    Combine results of repeated runs of a benchmark in one engine. The first
+    run is cold, its phases include compilation of queries for the engine,
+    the rest are warm and give steady state times.
+    """
+    cold, warm = runs[0], runs[1:]
+    res = OrderedDict()
+    for phase, value in cold.items():
+        # Results with units, like throughput, and engine init are taken from the cold run
+        numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if ", " in phase or not numeric or phase == "Engine init":
+            res[phase] = value
+            continue
+        steady = statistics.fmean(r[phase] for r in warm)
+        res[f"{phase} (cold)"] = value
+        res[f"{phase} (warm)"] = steady
+        res[f"{phase} compile overhead"] = value - steady
+    return res
+
+
+def write_results(benchmark_results: OrderedDict, args):
     with open(args.output, "w") if args.output is not None else sys.stdout as fp:
         if args.json:
             json.dump(benchmark_results, fp, indent=4)
@@ -0,0 +1,66 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import os
+import re
+import sys
+import subprocess
+
+import pytest
+
+LAUNCHER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "launcher.py")
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_getaffinity") or len(os.sched_getaffinity(0)) < 2,
+    reason="Background generation reserves a CPU core",
+)
+def test_next_dataset_generated_with_several_runs(tmp_path):
+    # Small datasets of every benchmark of -m all, generated twice per benchmark
+    output = subprocess.run(
+        [
+            sys.executable,
+            LAUNCHER,
+            "-m",
+            "all",
+            "--runs",
+            "2",
+            "--generate-only",
+            "--overlap-generation",
+            "--no-parallel",
+            "-tr",
+            "1000",
+            "-cr",
+            "1000",
+            "-trsr",
+            "20000",
+            "-tesr",
+            "200000",
+            "-trsmr",
+            "100",
+            "-tesmr",
+            "1000",
+        ],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    started = re.findall(r"Generating (\w+) dataset in background", output)
+    assert started == ["census", "plasticc"]
+    # Datasets are generated once, by background processes except the first
+    # one, and every run of a benchmark reuses them
+    assert output.count("Generating Census data file") == 1
+    assert output.count("Reusing Census data file") == 2
+    assert output.count("Generating Plasticc data files") == 1
+    assert output.count("Reusing Plasticc data files") == 2
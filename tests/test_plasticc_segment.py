@@ -0,0 +1,58 @@
+# Licensed to Modin Development Team under one or more contributor license agreements.
+# See the NOTICE file distributed with this work for additional information regarding
+# copyright ownership.  The Modin Development Team licenses this file to you under the
+# Apache License, Version 2.0 (the "License"); you may not use this file except in
+# compliance with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific language
+# governing permissions and limitations under the License.
+
+import numpy as np
+import pandas
+
+from benchmarks.plasticc import AGGS, segment_agg
+from generator.generator import PlasticcGenerator
+
+
+def check_segment_agg(df):
+    aggs = {column: funcs for column, funcs in AGGS.items() if column in df.columns}
+    expected = df.groupby("object_id", sort=False).agg(aggs)
+    actual = segment_agg(df, aggs)
+    assert np.array_equal(expected.index.to_numpy(), actual.index.to_numpy())
+    assert np.allclose(
+        expected.to_numpy(dtype=np.float64),
+        actual.to_numpy(dtype=np.float64),
+        rtol=1e-4,
+        equal_nan=True,
+    )
+
+
+def test_default_test_set_object_ids_are_unique(tmp_path):
+    gen = PlasticcGenerator(str(tmp_path / "plasticc"), False, False, 1)
+    metadata = gen._generate_metadata(
+        PlasticcGenerator._test_set_metadata_fields, 349_289
+    )
+    assert metadata["object_id"].is_unique
+
+
+def test_segment_agg_generated_test_set(tmp_path):
+    gen = PlasticcGenerator(str(tmp_path / "plasticc"), False, False, 1)
+    _, test_file, _, _ = gen.generate(20_000, 200_000, 100, 1_000)
+    check_segment_agg(pandas.read_csv(test_file))
+
+
+def test_segment_agg_repeated_runs():
+    rnd = np.random.default_rng(0)
+    keys = np.repeat([7, 3, 7, 5, 3], [4, 6, 2, 5, 3])
+    df = pandas.DataFrame(
+        {
+            "object_id": keys,
+            "flux": rnd.uniform(-100, 100, len(keys)),
+            "mjd": rnd.uniform(59580, 60674, len(keys)),
+        }
+    )
+    check_segment_agg(df)